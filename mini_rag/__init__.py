@@ -5,13 +5,30 @@ Hybrid semantic + BM25 search with RRF fusion, web scraping, deep research,
 LLM synthesis, and desktop GUI. Works with any OpenAI-compatible endpoint.
 """
 
+import importlib
+
 __version__ = "2.3.2"
 
-from .chunker import CodeChunker
-from .indexer import ProjectIndexer
-from .ollama_embeddings import OllamaEmbedder as CodeEmbedder
-from .search import CodeSearcher
-from .watcher import FileWatcher
+# Public classes are imported on first access so that importing a light
+# submodule (e.g. mini_rag.config) doesn't pull in LanceDB, pandas and
+# the embedding stack.
+_LAZY_EXPORTS = {
+    "CodeEmbedder": (".ollama_embeddings", "OllamaEmbedder"),
+    "CodeChunker": (".chunker", "CodeChunker"),
+    "ProjectIndexer": (".indexer", "ProjectIndexer"),
+    "CodeSearcher": (".search", "CodeSearcher"),
+    "FileWatcher": (".watcher", "FileWatcher"),
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module_name, attr = _LAZY_EXPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[name] = value  # Later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "CodeEmbedder",
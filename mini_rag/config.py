@@ -3,19 +3,163 @@ Configuration management for FSS-Mini-RAG.
 Handles loading, saving, and validation of YAML config files.
 """
 
+import copy
 import logging
-import re
-from dataclasses import asdict, dataclass
+import os
+import string
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
 
-import yaml
-import requests
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# Slotted config dataclasses (no per-instance __dict__) where supported (3.10+)
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Characters allowed in Ollama model names (e.g. qwen3:1.7b-q8_0). Built once so
+# sanitization is a single C-level translate instead of a regex substitution.
+_MODEL_NAME_ALLOWED = frozenset(string.ascii_letters + string.digits + ".:-_")
+_MODEL_NAME_STRIP = str.maketrans(
+    "", "", "".join(chr(c) for c in range(128) if chr(c) not in _MODEL_NAME_ALLOWED)
+)
+
+# Hostnames that mean Ollama runs on this machine
+_LOCAL_OLLAMA_HOSTS = frozenset({"localhost", "127.0.0.1", "::1"})
+
+# Default model preference rankings. These are trusted, already-clean names,
+# so model resolution skips sanitizing them.
+_DEFAULT_MODEL_RANKINGS = (
+    # Testing model (prioritized for current testing phase)
+    "qwen3:1.7b",
+    # Ultra-efficient models (perfect for CPU-only systems)
+    "qwen3:0.6b",
+    # Recommended model (excellent quality but larger)
+    "qwen3:4b",
+    # Common fallbacks (prioritize Qwen models)
+    "qwen2.5:1.5b",
+    "qwen2.5:3b",
+)
+_TRUSTED_MODEL_NAMES = frozenset(_DEFAULT_MODEL_RANKINGS)
+
+# Known quantization variants, keyed by lowercase model name
+_QUANTIZATION_PATTERNS = {
+    "qwen3:1.7b": ("qwen3:1.7b-q8_0", "qwen3:1.7b-q4_0", "qwen3:1.7b-q6_k"),
+    "qwen3:0.6b": ("qwen3:0.6b-q8_0", "qwen3:0.6b-q4_0", "qwen3:0.6b-q6_k"),
+    "qwen3:4b": ("qwen3:4b-q8_0", "qwen3:4b-q4_0", "qwen3:4b-q6_k"),
+    "qwen3:8b": ("qwen3:8b-q8_0", "qwen3:8b-q4_0", "qwen3:8b-q6_k"),
+    "qwen2.5:1.5b": ("qwen2.5:1.5b-q8_0", "qwen2.5:1.5b-q4_0"),
+    "qwen2.5:3b": ("qwen2.5:3b-q8_0", "qwen2.5:3b-q4_0"),
+    "qwen2.5-coder:1.5b": ("qwen2.5-coder:1.5b-q8_0", "qwen2.5-coder:1.5b-q4_0"),
+    "qwen2.5-coder:3b": ("qwen2.5-coder:3b-q8_0", "qwen2.5-coder:3b-q4_0"),
+    "qwen2.5-coder:7b": ("qwen2.5-coder:7b-q8_0", "qwen2.5-coder:7b-q4_0"),
+}
+
+# Suffixes tried for models not listed above
+_COMMON_MODEL_SUFFIXES = ("-q8_0", "-q4_0", "-q6_k", "-q4_k_m", "-instruct", "-base")
+
+
+# Commented config.yaml layout written by ConfigManager.save_config. Placeholders
+# are "<section>_<field>"; list fields are pre-rendered as indented "- " lines.
+_YAML_TEMPLATE = """\
+# FSS-Mini-RAG Configuration
+# Edit this file to customize indexing and search behavior
+# See docs/GETTING_STARTED.md for detailed explanations
+
+# Text chunking settings
+chunking:
+  max_size: {chunking_max_size}  # Max chars per chunk
+  min_size: {chunking_min_size}  # Min chars per chunk
+  strategy: {chunking_strategy}  # 'semantic' or 'fixed'
+
+# Large file streaming settings
+streaming:
+  enabled: {streaming_enabled}
+  threshold_bytes: {streaming_threshold_bytes}  # Stream files >1MB
+
+# File processing settings
+files:
+  min_file_size: {files_min_file_size}  # Skip small files
+  exclude_patterns:{files_exclude_patterns}
+  include_patterns:
+    - "**/*"                  # Include all files by default
+
+# Embedding settings (OpenAI-compatible endpoint)
+# Works with LM Studio, vLLM, OpenAI, or any compatible proxy
+# For Ollama: set provider to 'ollama' and base_url to 'http://localhost:11434'
+embedding:
+  provider: {embedding_provider}  # 'openai', 'ollama', 'ml'
+  base_url: {embedding_base_url}
+  model: {embedding_model}
+  batch_size: {embedding_batch_size}
+
+# Search behavior settings
+search:
+  default_top_k: {search_default_top_k}  # Top results
+  enable_bm25: {search_enable_bm25}  # Keyword boost
+  similarity_threshold: {search_similarity_threshold}  # Min score
+  expand_queries: {search_expand_queries}  # Auto expand
+
+# LLM synthesis and query expansion settings
+llm:
+  ollama_host: {llm_ollama_host}
+  synthesis_model: {llm_synthesis_model}  # Model name
+  expansion_model: {llm_expansion_model}  # Model name
+  max_expansion_terms: {llm_max_expansion_terms}  # Max terms
+  enable_synthesis: {llm_enable_synthesis}       # Enable synthesis by default
+  synthesis_temperature: {llm_synthesis_temperature}      # LLM temperature for analysis
+  answer_reuse_similarity: {llm_answer_reuse_similarity}    # Reuse explore answers to rephrased questions (0 = off)
+
+  # Context window configuration (critical for RAG performance)
+  # 💡 Sizing guide: 2K=1 question, 4K=1-2 questions, 8K=manageable, 16K=most users
+  #               32K=large codebases, 64K+=power users only
+  # ⚠️  Larger contexts use exponentially more CPU/memory - only increase if needed
+  # 🔧 Low context limits? Try smaller topk, better search terms, or archive noise
+  context_window: {llm_context_window}           # Context size in tokens
+  auto_context: {llm_auto_context}            # Auto-adjust context based on model capabilities
+
+  model_rankings:          # Preferred model order (edit to change priority){llm_model_rankings}
+
+# Auto-update system settings
+updates:
+  auto_check: {updates_auto_check}            # Check for updates automatically
+  check_frequency_hours: {updates_check_frequency_hours}    # Hours between update checks
+  auto_install: {updates_auto_install}          # Auto-install updates (not recommended)
+  backup_before_update: {updates_backup_before_update}   # Create backup before updating
+  notify_beta_releases: {updates_notify_beta_releases}   # Include beta releases in checks
+
+# Web scraper settings
+web_scraper:
+  enabled: {web_scraper_enabled}
+  output_dir: {web_scraper_output_dir}  # Session output directory
+  max_pages: {web_scraper_max_pages}  # Per session page limit
+  max_depth: {web_scraper_max_depth}  # Link following depth
+  timeout: {web_scraper_timeout}  # Per-request timeout seconds
+  min_content_length: {web_scraper_min_content_length}  # Skip thin pages
+  respect_robots: {web_scraper_respect_robots}  # Honour robots.txt
+  delay_between_requests: {web_scraper_delay_between_requests}  # Rate limit seconds
+
+# Web search engine settings
+search_engine:
+  engine: {search_engine_engine}  # duckduckgo, tavily, brave
+  max_results: {search_engine_max_results}  # Results per search
+  # tavily_api_key: null  # Set for Tavily search
+  # brave_api_key: null   # Set for Brave search\
+"""
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class ChunkingConfig:
     """Configuration for text chunking."""
 
@@ -24,7 +168,7 @@ class ChunkingConfig:
     strategy: str = "semantic"  # "semantic" or "fixed"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class StreamingConfig:
     """Configuration for large file streaming."""
 
@@ -32,7 +176,7 @@ class StreamingConfig:
     threshold_bytes: int = 1048576  # 1MB
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class FilesConfig:
     """Configuration for file processing."""
 
@@ -56,7 +200,7 @@ class FilesConfig:
             self.include_patterns = ["**/*"]  # Include everything by default
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class EmbeddingConfig:
     """Configuration for embedding generation.
 
@@ -79,7 +223,7 @@ class EmbeddingConfig:
     ml_model: str = "sentence-transformers/all-MiniLM-L6-v2"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class SearchConfig:
     """Configuration for search behavior."""
 
@@ -89,7 +233,7 @@ class SearchConfig:
     expand_queries: bool = False  # Enable automatic query expansion
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class LLMConfig:
     """Configuration for LLM synthesis and query expansion."""
 
@@ -99,6 +243,9 @@ class LLMConfig:
     max_expansion_terms: int = 8  # Maximum additional terms to add
     enable_synthesis: bool = False  # Enable by default when --synthesize used
     synthesis_temperature: float = 0.3
+    # Cosine similarity at which an explore question counts as a rephrasing of
+    # the one just answered and gets that answer back; 0 disables reuse
+    answer_reuse_similarity: float = 0.92
     enable_thinking: bool = True  # Enable thinking mode for Qwen3 models
     cpu_optimized: bool = True  # Prefer lightweight models
 
@@ -119,20 +266,10 @@ class LLMConfig:
     def __post_init__(self):
         if self.model_rankings is None:
             # Default model preference rankings (can be overridden in config file)
-            self.model_rankings = [
-                # Testing model (prioritized for current testing phase)
-                "qwen3:1.7b",
-                # Ultra-efficient models (perfect for CPU-only systems)
-                "qwen3:0.6b",
-                # Recommended model (excellent quality but larger)
-                "qwen3:4b",
-                # Common fallbacks (prioritize Qwen models)
-                "qwen2.5:1.5b",
-                "qwen2.5:3b",
-            ]
+            self.model_rankings = list(_DEFAULT_MODEL_RANKINGS)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ServerConfig:
     """Configuration for RAG server."""
 
@@ -140,7 +277,7 @@ class ServerConfig:
     host: str = "127.0.0.1"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class UpdateConfig:
     """Configuration for auto-update system."""
 
@@ -151,7 +288,7 @@ class UpdateConfig:
     notify_beta_releases: bool = False  # Include beta/pre-releases
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class WebScraperConfig:
     """Configuration for web scraping and content acquisition."""
 
@@ -166,7 +303,7 @@ class WebScraperConfig:
     user_agent: str = "FSS-Mini-RAG-Research/2.2"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class SearchEngineConfig:
     """Configuration for web search engines."""
 
@@ -176,7 +313,7 @@ class SearchEngineConfig:
     brave_api_key: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class DeepResearchConfig:
     """Configuration for iterative deep research sessions."""
 
@@ -189,7 +326,7 @@ class DeepResearchConfig:
     roundup_buffer_minutes: int = 5  # Start final roundup this many mins before deadline
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class RAGConfig:
     """Main RAG system configuration."""
 
@@ -229,6 +366,53 @@ class RAGConfig:
         if self.deep_research is None:
             self.deep_research = DeepResearchConfig()
 
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return a ``{section: {field: value}}`` dict of this config.
+
+        Cheaper than ``dataclasses.asdict``: every field value is a flat
+        scalar or a list of strings, so a shallow copy of each list is
+        enough to keep the result independent of the config.
+        """
+        config_dict = {}
+        for section_field in fields(self):
+            section = getattr(self, section_field.name)
+            section_dict = {}
+            for f in fields(section):
+                value = getattr(section, f.name)
+                section_dict[f.name] = list(value) if isinstance(value, list) else value
+            config_dict[section_field.name] = section_dict
+        return config_dict
+
+
+# Config file sections and the dataclass each one is loaded into, with the
+# field names each accepts (computed once rather than on every load)
+_CONFIG_SECTIONS = {
+    "chunking": ChunkingConfig,
+    "streaming": StreamingConfig,
+    "files": FilesConfig,
+    "embedding": EmbeddingConfig,
+    "search": SearchConfig,
+    "llm": LLMConfig,
+    "server": ServerConfig,
+    "updates": UpdateConfig,
+    "web_scraper": WebScraperConfig,
+    "search_engine": SearchEngineConfig,
+    "deep_research": DeepResearchConfig,
+}
+_CONFIG_SECTION_FIELDS = {
+    section: frozenset(f.name for f in fields(section_cls))
+    for section, section_cls in _CONFIG_SECTIONS.items()
+}
+
+
+def _is_local_ollama_host(ollama_host: str) -> bool:
+    """Whether a host[:port] setting names this machine (exact hostname match)."""
+    try:
+        hostname = urlsplit(f"http://{ollama_host}").hostname
+    except ValueError:
+        return False
+    return hostname in _LOCAL_OLLAMA_HOSTS
+
 
 class ConfigManager:
     """Manages configuration loading, saving, and validation."""
@@ -237,62 +421,58 @@ class ConfigManager:
         self.project_path = Path(project_path)
         self.rag_dir = self.project_path / ".mini-rag"
         self.config_path = self.rag_dir / "config.yaml"
+        # Last config loaded or saved, with the file (mtime_ns, size) it matches
+        self._config: Optional[RAGConfig] = None
+        self._config_stamp: Optional[Tuple[int, int]] = None
+        # Working config while inside a batch() block
+        self._batch_config: Optional[RAGConfig] = None
 
     def get_available_ollama_models(self, ollama_host: str = "localhost:11434") -> List[str]:
         """Get list of available Ollama models for validation with secure connection handling."""
         import time
-        
+
+        import requests  # Deferred: only needed when probing Ollama
+
+        # The URL is plain http, so there is no SSL path to fall back from. A
+        # local server either answers immediately or isn't running, so it gets
+        # one attempt with a tight timeout instead of the remote retry budget.
+        is_local = _is_local_ollama_host(ollama_host)
+        max_retries = 1 if is_local else 3
+        timeout = (1, 3) if is_local else (5, 10)  # (connect_timeout, read_timeout)
+
         # Retry logic with exponential backoff
-        max_retries = 3
         for attempt in range(max_retries):
             try:
-                # Use explicit timeout and SSL verification for security
                 response = requests.get(
-                    f"http://{ollama_host}/api/tags", 
-                    timeout=(5, 10),  # (connect_timeout, read_timeout)
-                    verify=True,  # Explicit SSL verification 
+                    f"http://{ollama_host}/api/tags",
+                    timeout=timeout,
                     allow_redirects=False  # Prevent redirect attacks
                 )
                 if response.status_code == 200:
-                    data = response.json()
+                    data = _json_loads(response.content)
                     models = [model["name"] for model in data.get("models", [])]
                     logger.debug(f"Successfully fetched {len(models)} Ollama models")
                     return models
                 else:
                     logger.debug(f"Ollama API returned status {response.status_code}")
-                    
-            except requests.exceptions.SSLError as e:
-                logger.debug(f"SSL verification failed for Ollama connection: {e}")
-                # For local Ollama, SSL might not be configured - this is expected
-                if "localhost" in ollama_host or "127.0.0.1" in ollama_host:
-                    logger.debug("Retrying with local connection (SSL not required for localhost)")
-                    # Local connections don't need SSL verification
-                    try:
-                        response = requests.get(f"http://{ollama_host}/api/tags", timeout=(5, 10))
-                        if response.status_code == 200:
-                            data = response.json()
-                            return [model["name"] for model in data.get("models", [])]
-                    except Exception as local_e:
-                        logger.debug(f"Local Ollama connection also failed: {local_e}")
-                break  # Don't retry SSL errors for remote hosts
-                
+
             except requests.exceptions.Timeout as e:
                 logger.debug(f"Ollama connection timeout (attempt {attempt + 1}/{max_retries}): {e}")
                 if attempt < max_retries - 1:
                     sleep_time = (2 ** attempt)  # Exponential backoff
                     time.sleep(sleep_time)
                     continue
-                    
+
             except requests.exceptions.ConnectionError as e:
                 logger.debug(f"Ollama connection error (attempt {attempt + 1}/{max_retries}): {e}")
                 if attempt < max_retries - 1:
                     time.sleep(1)
                     continue
-                    
+
             except Exception as e:
                 logger.debug(f"Unexpected error fetching Ollama models: {e}")
                 break
-                
+
         return []
 
     def _sanitize_model_name(self, model_name: str) -> str:
@@ -302,7 +482,10 @@ class ConfigManager:
         
         # Allow only alphanumeric, dots, colons, hyphens, underscores
         # This covers legitimate model names like qwen3:1.7b-q8_0
-        sanitized = re.sub(r'[^a-zA-Z0-9\.\:\-\_]', '', model_name)
+        # (non-ASCII is dropped by the encode, the rest by the translate table)
+        sanitized = (
+            model_name.encode("ascii", "ignore").decode("ascii").translate(_MODEL_NAME_STRIP)
+        )
         
         # Limit length to prevent DoS
         if len(sanitized) > 128:
@@ -311,75 +494,90 @@ class ConfigManager:
             
         return sanitized
 
-    def resolve_model_name(self, configured_model: str, available_models: List[str]) -> Optional[str]:
-        """Resolve configured model name to actual available model with input sanitization."""
+    def _build_model_index(
+        self, available_models: List[str]
+    ) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+        """Build lowercase lookup structures for resolving many names against one model list.
+
+        Returns a dict for exact (case-insensitive) hits and the ordered
+        (lowercase, original) pairs used for fuzzy matching.
+        """
+        pairs = [(model.lower(), model) for model in available_models]
+        exact = {}
+        for model_lower, model in pairs:
+            exact.setdefault(model_lower, model)  # First listed model wins
+        return exact, pairs
+
+    def resolve_model_name(
+        self,
+        configured_model: str,
+        available_models: List[str],
+        model_index: Optional[Tuple[Dict[str, str], List[Tuple[str, str]]]] = None,
+        *,
+        sanitize: bool = True,
+    ) -> Optional[str]:
+        """Resolve configured model name to actual available model with input sanitization.
+
+        Pass ``model_index`` from ``_build_model_index`` when resolving several
+        names against the same model list to avoid rebuilding it each call.
+        ``sanitize=False`` is only for names from a trusted internal source.
+        """
         if not available_models or not configured_model:
             return None
-        
+
         # Sanitize input to prevent injection
-        configured_model = self._sanitize_model_name(configured_model)
-        if not configured_model:
-            logger.warning("Model name was empty after sanitization")
-            return None
-            
+        if sanitize:
+            configured_model = self._sanitize_model_name(configured_model)
+            if not configured_model:
+                logger.warning("Model name was empty after sanitization")
+                return None
+
+        configured_lower = configured_model.lower()
+
         # Handle special 'auto' directive
-        if configured_model.lower() == 'auto':
+        if configured_lower == 'auto':
             return available_models[0] if available_models else None
-            
+
+        exact, pairs = model_index or self._build_model_index(available_models)
+
         # Direct exact match first (case-insensitive)
-        for available_model in available_models:
-            if configured_model.lower() == available_model.lower():
-                return available_model
-        
+        if configured_lower in exact:
+            return exact[configured_lower]
+
         # Fuzzy matching for common patterns
         model_patterns = self._get_model_patterns(configured_model)
-        
+
         for pattern in model_patterns:
-            for available_model in available_models:
-                if pattern.lower() in available_model.lower():
+            pattern_lower = pattern.lower()
+            for model_lower, available_model in pairs:
+                if pattern_lower in model_lower:
                     # Additional validation: ensure it's not a partial match of something else
                     if self._validate_model_match(pattern, available_model):
                         return available_model
-        
+
         return None  # Model not available
 
     def _get_model_patterns(self, configured_model: str) -> List[str]:
         """Generate fuzzy match patterns for common model naming conventions."""
         patterns = [configured_model]  # Start with exact name
-        
-        # Common quantization patterns for different models
-        quantization_patterns = {
-            'qwen3:1.7b': ['qwen3:1.7b-q8_0', 'qwen3:1.7b-q4_0', 'qwen3:1.7b-q6_k'],
-            'qwen3:0.6b': ['qwen3:0.6b-q8_0', 'qwen3:0.6b-q4_0', 'qwen3:0.6b-q6_k'],
-            'qwen3:4b': ['qwen3:4b-q8_0', 'qwen3:4b-q4_0', 'qwen3:4b-q6_k'],
-            'qwen3:8b': ['qwen3:8b-q8_0', 'qwen3:8b-q4_0', 'qwen3:8b-q6_k'],
-            'qwen2.5:1.5b': ['qwen2.5:1.5b-q8_0', 'qwen2.5:1.5b-q4_0'],
-            'qwen2.5:3b': ['qwen2.5:3b-q8_0', 'qwen2.5:3b-q4_0'],
-            'qwen2.5-coder:1.5b': ['qwen2.5-coder:1.5b-q8_0', 'qwen2.5-coder:1.5b-q4_0'],
-            'qwen2.5-coder:3b': ['qwen2.5-coder:3b-q8_0', 'qwen2.5-coder:3b-q4_0'],
-            'qwen2.5-coder:7b': ['qwen2.5-coder:7b-q8_0', 'qwen2.5-coder:7b-q4_0'],
-        }
-        
+
         # Add specific patterns for the configured model
-        if configured_model.lower() in quantization_patterns:
-            patterns.extend(quantization_patterns[configured_model.lower()])
-        
+        patterns.extend(_QUANTIZATION_PATTERNS.get(configured_model.lower(), ()))
+
         # Generic pattern generation for unknown models
         if ':' in configured_model:
             base_name, version = configured_model.split(':', 1)
-            
+
             # Add common quantization suffixes
-            common_suffixes = ['-q8_0', '-q4_0', '-q6_k', '-q4_k_m', '-instruct', '-base']
-            for suffix in common_suffixes:
-                patterns.append(f"{base_name}:{version}{suffix}")
-                
+            patterns.extend(f"{base_name}:{version}{suffix}" for suffix in _COMMON_MODEL_SUFFIXES)
+
             # Also try with instruct variants
             if 'instruct' not in version.lower():
-                patterns.append(f"{base_name}:{version}-instruct")
                 patterns.append(f"{base_name}:{version}-instruct-q8_0")
                 patterns.append(f"{base_name}:{version}-instruct-q4_0")
-        
-        return patterns
+
+        # Drop duplicates while keeping priority order
+        return list(dict.fromkeys(patterns))
 
     def _validate_model_match(self, pattern: str, available_model: str) -> bool:
         """Validate that a fuzzy match is actually correct and not a false positive."""
@@ -415,31 +613,46 @@ class ConfigManager:
             if not available_models:
                 logger.debug("No Ollama models available for validation")
                 return config
-                
+
+            model_index = self._build_model_index(available_models)
+            resolved_names: Dict[str, Optional[str]] = {}
+
+            def resolve(model: str) -> Optional[str]:
+                # Rankings usually repeat the synthesis model, so resolve each name once.
+                # Built-in defaults are trusted; anything else is sanitized.
+                if model not in resolved_names:
+                    resolved_names[model] = self.resolve_model_name(
+                        model,
+                        available_models,
+                        model_index,
+                        sanitize=model not in _TRUSTED_MODEL_NAMES,
+                    )
+                return resolved_names[model]
+
             # Resolve synthesis model
             if config.llm.synthesis_model != "auto":
-                resolved = self.resolve_model_name(config.llm.synthesis_model, available_models)
+                resolved = resolve(config.llm.synthesis_model)
                 if resolved and resolved != config.llm.synthesis_model:
                     logger.info(f"Resolved synthesis model: {config.llm.synthesis_model} -> {resolved}")
                     config.llm.synthesis_model = resolved
                 elif not resolved:
                     logger.warning(f"Synthesis model '{config.llm.synthesis_model}' not found, keeping original")
-                    
+
             # Resolve expansion model (if different from synthesis)
-            if (config.llm.expansion_model != "auto" and 
+            if (config.llm.expansion_model != "auto" and
                 config.llm.expansion_model != config.llm.synthesis_model):
-                resolved = self.resolve_model_name(config.llm.expansion_model, available_models)
+                resolved = resolve(config.llm.expansion_model)
                 if resolved and resolved != config.llm.expansion_model:
                     logger.info(f"Resolved expansion model: {config.llm.expansion_model} -> {resolved}")
                     config.llm.expansion_model = resolved
                 elif not resolved:
                     logger.warning(f"Expansion model '{config.llm.expansion_model}' not found, keeping original")
-            
+
             # Update model rankings with resolved names
             if config.llm.model_rankings:
                 updated_rankings = []
                 for model in config.llm.model_rankings:
-                    resolved = self.resolve_model_name(model, available_models)
+                    resolved = resolve(model)
                     if resolved:
                         updated_rankings.append(resolved)
                         if resolved != model:
@@ -447,23 +660,37 @@ class ConfigManager:
                     else:
                         updated_rankings.append(model)  # Keep original if not resolved
                 config.llm.model_rankings = updated_rankings
-                        
+
         except Exception as e:
             logger.debug(f"Model validation failed: {e}")
             
         return config
 
     def load_config(self) -> RAGConfig:
-        """Load configuration from YAML file or create default."""
-        if not self.config_path.exists():
+        """Load configuration from YAML file or create default.
+
+        The parsed config is cached until the file's mtime or size changes, so
+        repeat loads skip the YAML parse and Ollama model probe. Each call
+        returns an independent copy that callers may mutate freely.
+        """
+        stamp = self._get_config_stamp()
+        if stamp is None:
             logger.info(f"No config found at {self.config_path}, creating default")
             config = RAGConfig()
             self.save_config(config)
             return config
 
+        if self._config is not None and stamp == self._config_stamp:
+            return copy.deepcopy(self._config)
+
+        import yaml  # Deferred: default configs never touch YAML
+
+        # libyaml's C parser when PyYAML was built with it, else the pure-Python one
+        safe_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
         try:
-            with open(self.config_path, "r") as f:
-                data = yaml.safe_load(f)
+            # Bytes go straight to the parser, which handles decoding itself
+            data = yaml.load(self.config_path.read_bytes(), Loader=safe_loader)
 
             if not data:
                 logger.warning("Empty config file, using defaults")
@@ -472,28 +699,14 @@ class ConfigManager:
             # Convert nested dicts back to dataclass instances
             config = RAGConfig()
 
-            if "chunking" in data:
-                config.chunking = ChunkingConfig(**data["chunking"])
-            if "streaming" in data:
-                config.streaming = StreamingConfig(**data["streaming"])
-            if "files" in data:
-                config.files = FilesConfig(**data["files"])
-            if "embedding" in data:
-                config.embedding = EmbeddingConfig(**data["embedding"])
-            if "search" in data:
-                config.search = SearchConfig(**data["search"])
-            if "llm" in data:
-                config.llm = LLMConfig(**data["llm"])
-            if "web_scraper" in data:
-                config.web_scraper = WebScraperConfig(**data["web_scraper"])
-            if "search_engine" in data:
-                config.search_engine = SearchEngineConfig(**data["search_engine"])
-            if "deep_research" in data:
-                config.deep_research = DeepResearchConfig(**data["deep_research"])
+            for section, section_data in data.items():
+                if section in _CONFIG_SECTIONS:
+                    setattr(config, section, self._section_from_dict(section, section_data))
 
             # Validate and resolve model names if Ollama is available
             config = self.validate_and_resolve_models(config)
 
+            self._remember_config(config, stamp)
             return config
 
         except yaml.YAMLError as e:
@@ -514,149 +727,94 @@ class ConfigManager:
             logger.info("Using default configuration")
             return RAGConfig()
 
+    def _section_from_dict(self, section: str, section_data: Any):
+        """Build one config section from YAML data, skipping keys it doesn't define."""
+        section_cls = _CONFIG_SECTIONS[section]
+        if section_data is None:
+            return section_cls()
+        if not isinstance(section_data, dict):
+            logger.warning(f"Config section '{section}' is not a mapping, using defaults")
+            return section_cls()
+
+        known_fields = _CONFIG_SECTION_FIELDS[section]
+        values = {}
+        for key, value in section_data.items():
+            if key in known_fields:
+                values[key] = value
+            else:
+                logger.warning(f"Ignoring unknown config key: {section}.{key}")
+        return section_cls(**values)
+
     def save_config(self, config: RAGConfig):
-        """Save configuration to YAML file with comments."""
+        """Save configuration to YAML file with comments using atomic write."""
+        tmp_path = self.config_path.with_suffix(".tmp")
         try:
             self.rag_dir.mkdir(exist_ok=True)
 
             # Convert to dict for YAML serialization
-            config_dict = asdict(config)
+            config_dict = config.to_dict()
 
             # Create YAML content with comments
             yaml_content = self._create_yaml_with_comments(config_dict)
 
-            # Write with basic file locking to prevent corruption
-            with open(self.config_path, "w") as f:
-                try:
-                    import fcntl
-
-                    fcntl.flock(
-                        f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB
-                    )  # Non-blocking exclusive lock
-                    f.write(yaml_content)
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)  # Unlock
-                except (OSError, ImportError):
-                    # Fallback for Windows or if fcntl unavailable
-                    f.write(yaml_content)
+            # Write to a sibling temp file and swap it in, so a crash mid-write
+            # never leaves a truncated config behind
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(yaml_content)
+                f.flush()
+                os.fsync(f.fileno())
+            tmp_path.replace(self.config_path)
+            self._remember_config(config, self._get_config_stamp())
 
             logger.info(f"Configuration saved to {self.config_path}")
 
         except Exception as e:
             logger.error(f"Failed to save config to {self.config_path}: {e}")
+            tmp_path.unlink(missing_ok=True)
 
     def _create_yaml_with_comments(self, config_dict: Dict[str, Any]) -> str:
         """Create YAML content with helpful comments."""
-        yaml_lines = [
-            "# FSS-Mini-RAG Configuration",
-            "# Edit this file to customize indexing and search behavior",
-            "# See docs/GETTING_STARTED.md for detailed explanations",
-            "",
-            "# Text chunking settings",
-            "chunking:",
-            f"  max_size: {config_dict['chunking']['max_size']}  # Max chars per chunk",
-            f"  min_size: {config_dict['chunking']['min_size']}  # Min chars per chunk",
-            f"  strategy: {config_dict['chunking']['strategy']}  # 'semantic' or 'fixed'",
-            "",
-            "# Large file streaming settings",
-            "streaming:",
-            f"  enabled: {str(config_dict['streaming']['enabled']).lower()}",
-            f"  threshold_bytes: {config_dict['streaming']['threshold_bytes']}  # Stream files >1MB",
-            "",
-            "# File processing settings",
-            "files:",
-            f"  min_file_size: {config_dict['files']['min_file_size']}  # Skip small files",
-            "  exclude_patterns:",
-        ]
-
-        for pattern in config_dict["files"]["exclude_patterns"]:
-            yaml_lines.append(f'    - "{pattern}"')
-
-        yaml_lines.extend(
-            [
-                "  include_patterns:",
-                '    - "**/*"                  # Include all files by default',
-                "",
-                "# Embedding settings (OpenAI-compatible endpoint)",
-                "# Works with LM Studio, vLLM, OpenAI, or any compatible proxy",
-                "# For Ollama: set provider to 'ollama' and base_url to 'http://localhost:11434'",
-                "embedding:",
-                f"  provider: {config_dict['embedding']['provider']}  # 'openai', 'ollama', 'ml'",
-                f"  base_url: {config_dict['embedding']['base_url']}",
-                f"  model: {config_dict['embedding']['model']}",
-                f"  batch_size: {config_dict['embedding']['batch_size']}",
-                "",
-                "# Search behavior settings",
-                "search:",
-                f"  default_top_k: {config_dict['search']['default_top_k']}  # Top results",
-                f"  enable_bm25: {str(config_dict['search']['enable_bm25']).lower()}  # Keyword boost",
-                f"  similarity_threshold: {config_dict['search']['similarity_threshold']}  # Min score",
-                f"  expand_queries: {str(config_dict['search']['expand_queries']).lower()}  # Auto expand",
-                "",
-                "# LLM synthesis and query expansion settings",
-                "llm:",
-                f"  ollama_host: {config_dict['llm']['ollama_host']}",
-                f"  synthesis_model: {config_dict['llm']['synthesis_model']}  # Model name",
-                f"  expansion_model: {config_dict['llm']['expansion_model']}  # Model name",
-                f"  max_expansion_terms: {config_dict['llm']['max_expansion_terms']}  # Max terms",
-                f"  enable_synthesis: {str(config_dict['llm']['enable_synthesis']).lower()}       # Enable synthesis by default",
-                f"  synthesis_temperature: {config_dict['llm']['synthesis_temperature']}      # LLM temperature for analysis",
-                "",
-                "  # Context window configuration (critical for RAG performance)",
-                "  # 💡 Sizing guide: 2K=1 question, 4K=1-2 questions, 8K=manageable, 16K=most users",
-                "  #               32K=large codebases, 64K+=power users only",
-                "  # ⚠️  Larger contexts use exponentially more CPU/memory - only increase if needed",
-                "  # 🔧 Low context limits? Try smaller topk, better search terms, or archive noise",
-                f"  context_window: {config_dict['llm']['context_window']}           # Context size in tokens",
-                f"  auto_context: {str(config_dict['llm']['auto_context']).lower()}            # Auto-adjust context based on model capabilities",
-                "",
-                "  model_rankings:          # Preferred model order (edit to change priority)",
-            ]
+        # Flatten sections to "<section>_<key>" so the template fills in one pass
+        values = {}
+        for section, section_values in config_dict.items():
+            for key, value in section_values.items():
+                if isinstance(value, bool):
+                    value = str(value).lower()
+                values[f"{section}_{key}"] = value
+
+        values["files_exclude_patterns"] = "".join(
+            f'\n    - "{pattern}"' for pattern in config_dict["files"]["exclude_patterns"]
         )
 
-        # Add model rankings list
-        if "model_rankings" in config_dict["llm"] and config_dict["llm"]["model_rankings"]:
-            for model in config_dict["llm"]["model_rankings"][:10]:  # Show first 10
-                yaml_lines.append(f'    - "{model}"')
-            if len(config_dict["llm"]["model_rankings"]) > 10:
-                yaml_lines.append("    # ... (edit config to see all options)")
-
-        # Add update settings
-        yaml_lines.extend(
-            [
-                "",
-                "# Auto-update system settings",
-                "updates:",
-                f"  auto_check: {str(config_dict['updates']['auto_check']).lower()}            # Check for updates automatically",
-                f"  check_frequency_hours: {config_dict['updates']['check_frequency_hours']}    # Hours between update checks",
-                f"  auto_install: {str(config_dict['updates']['auto_install']).lower()}          # Auto-install updates (not recommended)",
-                f"  backup_before_update: {str(config_dict['updates']['backup_before_update']).lower()}   # Create backup before updating",
-                f"  notify_beta_releases: {str(config_dict['updates']['notify_beta_releases']).lower()}   # Include beta releases in checks",
-                "",
-                "# Web scraper settings",
-                "web_scraper:",
-                f"  enabled: {str(config_dict['web_scraper']['enabled']).lower()}",
-                f"  output_dir: {config_dict['web_scraper']['output_dir']}  # Session output directory",
-                f"  max_pages: {config_dict['web_scraper']['max_pages']}  # Per session page limit",
-                f"  max_depth: {config_dict['web_scraper']['max_depth']}  # Link following depth",
-                f"  timeout: {config_dict['web_scraper']['timeout']}  # Per-request timeout seconds",
-                f"  min_content_length: {config_dict['web_scraper']['min_content_length']}  # Skip thin pages",
-                f"  respect_robots: {str(config_dict['web_scraper']['respect_robots']).lower()}  # Honour robots.txt",
-                f"  delay_between_requests: {config_dict['web_scraper']['delay_between_requests']}  # Rate limit seconds",
-                "",
-                "# Web search engine settings",
-                "search_engine:",
-                f"  engine: {config_dict['search_engine']['engine']}  # duckduckgo, tavily, brave",
-                f"  max_results: {config_dict['search_engine']['max_results']}  # Results per search",
-                "  # tavily_api_key: null  # Set for Tavily search",
-                "  # brave_api_key: null   # Set for Brave search",
-            ]
-        )
+        rankings = config_dict["llm"].get("model_rankings") or []
+        rankings_block = "".join(f'\n    - "{model}"' for model in rankings[:10])  # Show first 10
+        if len(rankings) > 10:
+            rankings_block += "\n    # ... (edit config to see all options)"
+        values["llm_model_rankings"] = rankings_block
+
+        return _YAML_TEMPLATE.format_map(values)
+
+    def _get_config_stamp(self) -> Optional[Tuple[int, int]]:
+        """Return the config file's (mtime_ns, size), or None if it is missing."""
+        try:
+            st = self.config_path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
 
-        return "\n".join(yaml_lines)
+    def _remember_config(self, config: RAGConfig, stamp: Optional[Tuple[int, int]]):
+        """Cache a private copy of ``config`` as the contents of the file at ``stamp``."""
+        self._config = copy.deepcopy(config)
+        self._config_stamp = stamp
 
-    def update_config(self, **kwargs) -> RAGConfig:
-        """Update specific configuration values."""
-        config = self.load_config()
+    def update_config(self, config: Optional[RAGConfig] = None, **kwargs) -> RAGConfig:
+        """Update specific configuration values.
+
+        Pass ``config`` to update an already-loaded config without re-reading
+        the file. Otherwise the cached config from ``load_config`` is used.
+        """
+        if config is None:
+            config = self._batch_config or self.load_config()
 
         for key, value in kwargs.items():
             if hasattr(config, key):
@@ -664,5 +822,36 @@ class ConfigManager:
             else:
                 logger.warning(f"Unknown config key: {key}")
 
-        self.save_config(config)
+        # Inside batch() the write happens once, when the block exits
+        if config is not self._batch_config:
+            self._save_if_changed(config)
         return config
+
+    @contextmanager
+    def batch(self) -> Iterator[RAGConfig]:
+        """Group several ``update_config`` calls into a single save.
+
+        Updates inside the block apply to one working config, which is
+        written once when the block exits. Nothing is written if the block
+        raises.
+        """
+        if self._batch_config is not None:
+            # Nested batch: the outermost block does the save
+            yield self._batch_config
+            return
+
+        config = self._batch_config = self.load_config()
+        try:
+            yield config
+        finally:
+            self._batch_config = None
+        self._save_if_changed(config)
+
+    def _save_if_changed(self, config: RAGConfig):
+        """Save the config unless it still matches what is on disk."""
+        stamp = self._get_config_stamp()
+        if stamp is not None and stamp == self._config_stamp and config == self._config:
+            logger.debug("Config unchanged, skipping save")
+            return
+
+        self.save_config(config)
@@ -8,20 +8,32 @@ Perfect for exploring codebases with detailed reasoning and follow-up questions.
 
 import json
 import logging
+import threading
 import time
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 try:
     from .config import RAGConfig
-    from .llm_synthesizer import LLMSynthesizer, SynthesisResult
+    from .llm_synthesizer import OLLAMA_KEEP_ALIVE, LLMSynthesizer, SynthesisResult
     from .search import CodeSearcher
     from .system_context import get_system_context
 except ImportError:
     # For direct testing
     from config import RAGConfig
-    from llm_synthesizer import LLMSynthesizer, SynthesisResult
+    from llm_synthesizer import OLLAMA_KEEP_ALIVE, LLMSynthesizer, SynthesisResult
     from search import CodeSearcher
 
     def get_system_context(x=None):
@@ -30,6 +42,199 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Search result content limits for exploration prompts: per result, and across
+# all results so a page of long chunks can't crowd out the model's context
+RESULT_CONTENT_CHARS = 800
+RESULTS_CONTEXT_BUDGET = 6000
+
+# Exploration prompt skeleton, filled per question by _build_contextual_prompt
+_EXPLORE_PROMPT_TEMPLATE = """<think>
+The user asked: "{question}"
+
+System context: {system_context}
+
+Let me analyze what they're asking and look at the information I have available.
+
+From the search results, I can see relevant information about:
+{results_preview}...
+
+I should think about:
+1. What the user is trying to understand or accomplish
+2. What information from the search results is most relevant
+3. How to explain this in a clear, educational way
+4. What practical next steps would be helpful
+
+Based on our conversation so far: {context_summary}
+
+Let me create a helpful response that breaks this down clearly and gives them actionable guidance.
+</think>
+
+You're a helpful assistant exploring a project with someone. You're good at breaking down complex topics into understandable pieces and explaining things clearly.
+
+PROJECT: {project}
+
+PREVIOUS CONVERSATION:
+{context_summary}
+
+CURRENT QUESTION: "{question}"
+
+RELEVANT INFORMATION FOUND:
+{results_text}
+
+Please provide a helpful, natural explanation that answers their question. Write as if you're having a friendly conversation with a colleague who's exploring this project.
+
+Structure your response to include:
+1. A clear explanation of what you found and how it answers their question
+2. The most important insights from the information you discovered
+3. Relevant examples or code patterns when helpful
+4. Practical next steps they could take
+
+Guidelines:
+- Write in a conversational, friendly tone
+- Be educational but not condescending
+- Reference specific files and information when helpful
+- Give practical, actionable suggestions
+- Connect everything back to their original question
+- Use natural language, not structured formats
+- Break complex topics into understandable pieces
+"""
+
+# One search result within the prompt's RELEVANT INFORMATION section
+_RESULT_BLOCK_TEMPLATE = """
+Result {i} (Score: {score:.3f}):
+File: {file_path}
+Content: {content}
+"""
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to ``limit`` chars, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class _ThinkingSplitter:
+    """Split streamed model output into thinking and answer text in one pass.
+
+    Text between <think> and </think> is thinking; everything else is the
+    answer. A tag split across two chunks is held back until the next chunk
+    completes it.
+    """
+
+    def __init__(self):
+        self.in_thinking = False
+        self.saw_tags = False
+        self._pending = ""
+        self._thinking: List[str] = []
+        self._answer: List[str] = []
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the thinking text it contained."""
+        text = self._pending + chunk
+        self._pending = ""
+        shown = []
+        while text:
+            tag = "</think>" if self.in_thinking else "<think>"
+            before, found, after = text.partition(tag)
+            if found:
+                self._emit(before, shown)
+                self.in_thinking = not self.in_thinking
+                self.saw_tags = True
+                text = after
+                continue
+
+            # Hold back a trailing partial tag for the next chunk
+            held = next(
+                (n for n in range(min(len(tag) - 1, len(text)), 0, -1) if text.endswith(tag[:n])),
+                0,
+            )
+            self._emit(text[: len(text) - held], shown)
+            self._pending = text[len(text) - held :]
+            break
+        return "".join(shown)
+
+    def _emit(self, text: str, shown: List[str]):
+        if not text:
+            return
+        if self.in_thinking:
+            self._thinking.append(text)
+            shown.append(text)
+        else:
+            self._answer.append(text)
+
+    def finish(self) -> Tuple[str, str]:
+        """Flush held-back text and return ``(thinking, answer)``."""
+        self._emit(self._pending, [])
+        self._pending = ""
+        if self.in_thinking:
+            # Never closed: the model didn't finish thinking, so keep it all as the answer
+            self._answer.extend(self._thinking)
+            self._thinking = []
+        return "".join(self._thinking).strip(), "".join(self._answer).strip()
+
+
+# Searchers and synthesizers shared by every CodeExplorer in the process, so
+# repeat sessions don't reload the index and BM25 or re-probe the LLM server.
+# Searchers are stored with the manifest mtime they were built against, so a
+# re-index (from this process or another) gets a fresh table and BM25 index
+_searchers: Dict[Path, Tuple[int, CodeSearcher]] = {}
+_synthesizers: Dict[Tuple, LLMSynthesizer] = {}
+_component_lock = threading.Lock()
+
+# Pooled HTTP session for Ollama, so each exploration turn reuses an open
+# connection instead of handshaking again
+_ollama_session = requests.Session()
+
+# _check_model_restart_needed answers, keyed by (ollama_url, model)
+_restart_probe_results: Dict[Tuple[str, str], bool] = {}
+
+
+def _index_stamp(project_path: Path) -> int:
+    """Modification time of a project's index manifest, 0 if it has none."""
+    try:
+        return (project_path / ".mini-rag" / "manifest.json").stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _get_searcher(project_path: Path) -> CodeSearcher:
+    """Get or create the shared searcher for a project's current index."""
+    key = Path(project_path).resolve()
+    stamp = _index_stamp(key)
+    with _component_lock:
+        cached = _searchers.get(key)
+        if cached is None or cached[0] != stamp:
+            cached = _searchers[key] = (stamp, CodeSearcher(project_path))
+        return cached[1]
+
+
+def _get_synthesizer(config: RAGConfig) -> LLMSynthesizer:
+    """Get or create the shared thinking-mode synthesizer for an LLM config."""
+    llm = config.llm
+    key = (
+        llm.ollama_host,
+        llm.synthesis_model,
+        tuple(llm.model_rankings or ()),
+        llm.context_window,
+        llm.auto_context,
+    )
+    with _component_lock:
+        if key not in _synthesizers:
+            _synthesizers[key] = LLMSynthesizer(
+                ollama_url=f"http://{llm.ollama_host}",
+                model=llm.synthesis_model,
+                enable_thinking=True,  # Always enable thinking in explore mode
+                config=config,  # Pass config for model rankings
+                session=_ollama_session,
+            )
+        return _synthesizers[key]
+
+
+def clear_component_cache():
+    """Drop shared searchers and synthesizers, e.g. after re-indexing a project."""
+    with _component_lock:
+        _searchers.clear()
+        _synthesizers.clear()
+
 
 @dataclass
 class ExplorationSession:
@@ -39,11 +244,62 @@ class ExplorationSession:
     conversation_history: List[Dict[str, Any]]
     session_id: str
     started_at: float
+    # "Previous Qn/An" blocks for the last three exchanges, rendered once each
+    context_blocks: Deque[str] = field(default_factory=lambda: deque(maxlen=3))
+    # Context blocks joined, ready to drop into the next prompt
+    context_summary: str = ""
+    # Unit-length question embeddings, the answers given to them, and the
+    # context generation each was answered in
+    answered_embeddings: List[np.ndarray] = field(default_factory=list)
+    answers: List[SynthesisResult] = field(default_factory=list)
+    answer_generations: List[int] = field(default_factory=list)
+    # Bumped by every newly synthesized answer; a reused answer leaves the
+    # context as it was
+    context_generation: int = 0
+    # Monotonic clock reading at session start, for durations immune to clock changes
+    started_monotonic: float = field(default_factory=time.monotonic)
+
+    def elapsed(self) -> float:
+        """Seconds since the session started."""
+        return time.monotonic() - self.started_monotonic
+
+    def find_similar_answer(
+        self, embedding: np.ndarray, threshold: float
+    ) -> Optional[SynthesisResult]:
+        """Return the answer to an earlier question close enough to this one.
+
+        Only answers given in the current context qualify, so a follow-up
+        asked after other questions is answered afresh. A threshold of 0
+        disables reuse.
+        """
+        if threshold <= 0 or not self.answered_embeddings:
+            return None
+        similarities = np.stack(self.answered_embeddings) @ embedding
+        for best in np.argsort(similarities)[::-1]:
+            if similarities[best] < threshold:
+                break
+            if self.answer_generations[best] == self.context_generation:
+                return self.answers[best]
+        return None
+
+    def remember_answer(self, embedding: np.ndarray, synthesis: SynthesisResult):
+        """Keep a newly synthesized answer for reuse by rephrasings of its question."""
+        self.context_generation += 1
+        self.answered_embeddings.append(embedding)
+        self.answers.append(synthesis)
+        self.answer_generations.append(self.context_generation)
 
     def add_exchange(
         self, question: str, search_results: List[Any], response: SynthesisResult
     ):
         """Add a question/response exchange to the conversation history."""
+        exchange_number = len(self.conversation_history) + 1
+        self.context_blocks.append(
+            f"Previous Q{exchange_number}: {question}\n"
+            f"Previous A{exchange_number}: {response.summary}"
+        )
+        self.context_summary = "\n".join(self.context_blocks)
+
         self.conversation_history.append(
             {
                 "timestamp": time.time(),
@@ -67,18 +323,16 @@ class CodeExplorer:
         self.project_path = project_path
         self.config = config or RAGConfig()
 
-        # Initialize components with thinking enabled
-        self.searcher = CodeSearcher(project_path)
-        self.synthesizer = LLMSynthesizer(
-            ollama_url=f"http://{self.config.llm.ollama_host}",
-            model=self.config.llm.synthesis_model,
-            enable_thinking=True,  # Always enable thinking in explore mode
-            config=self.config,  # Pass config for model rankings
-        )
+        # Reuse components with thinking enabled across explorers
+        self.searcher = _get_searcher(project_path)
+        self.synthesizer = _get_synthesizer(self.config)
 
         # Session management
         self.current_session: Optional[ExplorationSession] = None
 
+        # OS/project hint for prompts; fixed for the project, so built once
+        self._system_context: Optional[str] = None
+
     def start_exploration_session(self) -> bool:
         """Start a new exploration session."""
 
@@ -105,6 +359,22 @@ class CodeExplorer:
         if not self.current_session:
             return "❌ No exploration session active. Start one first."
 
+        # A rephrasing of an earlier question gets the earlier answer back
+        question_embedding = self._embed_question(question)
+        if question_embedding is not None:
+            reused = self.current_session.find_similar_answer(
+                question_embedding, self.config.llm.answer_reuse_similarity
+            )
+            if reused is not None:
+                print(reused.summary)
+                self.current_session.add_exchange(question, [], reused)
+                exchange_count = len(self.current_session.conversation_history)
+                session_duration = self.current_session.elapsed()
+                return (
+                    f"\n📊 Session: {session_duration/60:.1f}m | Question #{exchange_count}"
+                    " | Reused answer to a similar earlier question"
+                )
+
         # Search for relevant information
         search_start = time.time()
         results = self.searcher.search(
@@ -126,101 +396,82 @@ class CodeExplorer:
 
         # Add to conversation history
         self.current_session.add_exchange(question, results, synthesis)
+        if question_embedding is not None and synthesis.confidence > 0:
+            self.current_session.remember_answer(question_embedding, synthesis)
+        else:
+            # The context still moved on, so earlier answers no longer apply
+            self.current_session.context_generation += 1
 
         # Streaming already displayed the response
         # Just return minimal status for caller
-        session_duration = time.time() - self.current_session.started_at
+        session_duration = self.current_session.elapsed()
         exchange_count = len(self.current_session.conversation_history)
 
         status = f"\n📊 Session: {session_duration/60:.1f}m | Question #{exchange_count} | Results: {len(results)} | Time: {search_time+synthesis_time:.1f}s"
         return status
 
-    def _build_contextual_prompt(self, question: str, results: List[Any]) -> str:
-        """Build a prompt that includes conversation context."""
-        # Get recent conversation context (last 3 exchanges)
-        if self.current_session.conversation_history:
-            recent_exchanges = self.current_session.conversation_history[-3:]
-            context_parts = []
+    def _embed_question(self, question: str) -> Optional[np.ndarray]:
+        """Embed a question as a unit vector, or None if embeddings are unavailable.
 
-            for i, exchange in enumerate(recent_exchanges, 1):
-                prev_q = exchange["question"]
-                prev_summary = exchange["response"]["summary"]
-                context_parts.append(f"Previous Q{i}: {prev_q}")
-                context_parts.append(f"Previous A{i}: {prev_summary}")
+        The bare question is embedded; the search-query prefix would be shared
+        by every question and pull short, different ones together.
+        """
+        if self.config.llm.answer_reuse_similarity <= 0:
+            return None
+        try:
+            embedding = np.asarray(self.searcher.embedder.embed_text(question), dtype=np.float32)
+        except Exception as e:
+            logger.debug(f"Question embedding unavailable, not reusing answers: {e}")
+            return None
+        norm = np.linalg.norm(embedding)
+        if not norm:
+            return None
+        return embedding / norm
 
-            # "\n".join(context_parts)  # Unused variable removed
+    def _build_contextual_prompt(self, question: str, results: List[Any]) -> str:
+        """Build a prompt that includes conversation context."""
+        # Recent conversation context (last 3 exchanges), kept rendered by the session
+        context_summary = (
+            self.current_session.context_summary or "None yet - this is the first question."
+        )
 
-        # Build search results context
+        # Build search results context within the shared character budget
         results_context = []
+        remaining = RESULTS_CONTEXT_BUDGET
         for i, result in enumerate(results[:8], 1):
-            # result.file_path if hasattr(result, "file_path") else "unknown"  # Unused variable removed
-            # result.content if hasattr(result, "content") else str(result)  # Unused variable removed
-            # result.score if hasattr(result, "score") else 0.0  # Unused variable removed
+            if remaining <= 0:
+                break
+            file_path = getattr(result, "file_path", "unknown")
+            content = getattr(result, "content", None)
+            if content is None:
+                content = str(result)
+            score = getattr(result, "score", 0.0)
+            content = _truncate(content, min(RESULT_CONTENT_CHARS, remaining))
+            remaining -= len(content)
 
             results_context.append(
-                """
-Result {i} (Score: {score:.3f}):
-File: {file_path}
-Content: {content[:800]}{'...' if len(content) > 800 else ''}
-"""
+                _RESULT_BLOCK_TEMPLATE.format_map(
+                    {"i": i, "score": score, "file_path": file_path, "content": content}
+                )
             )
 
-        # "\n".join(results_context)  # Unused variable removed
+        results_text = "\n".join(results_context)
 
         # Get system context for better responses
-        # get_system_context(self.project_path)  # Unused variable removed
+        if self._system_context is None:
+            self._system_context = get_system_context(self.project_path)
 
         # Create comprehensive exploration prompt with thinking
-        prompt = """<think>
-The user asked: "{question}"
-
-System context: {system_context}
-
-Let me analyze what they're asking and look at the information I have available.
-
-From the search results, I can see relevant information about:
-{results_text[:500]}...
-
-I should think about:
-1. What the user is trying to understand or accomplish
-2. What information from the search results is most relevant
-3. How to explain this in a clear, educational way
-4. What practical next steps would be helpful
-
-Based on our conversation so far: {context_summary}
-
-Let me create a helpful response that breaks this down clearly and gives them actionable guidance.
-</think>
-
-You're a helpful assistant exploring a project with someone. You're good at breaking down complex topics into understandable pieces and explaining things clearly.
-
-PROJECT: {self.project_path.name}
-
-PREVIOUS CONVERSATION:
-{context_summary}
-
-CURRENT QUESTION: "{question}"
-
-RELEVANT INFORMATION FOUND:
-{results_text}
-
-Please provide a helpful, natural explanation that answers their question. Write as if you're having a friendly conversation with a colleague who's exploring this project.
-
-Structure your response to include:
-1. A clear explanation of what you found and how it answers their question
-2. The most important insights from the information you discovered
-3. Relevant examples or code patterns when helpful
-4. Practical next steps they could take
-
-Guidelines:
-- Write in a conversational, friendly tone
-- Be educational but not condescending
-- Reference specific files and information when helpful
-- Give practical, actionable suggestions
-- Connect everything back to their original question
-- Use natural language, not structured formats
-- Break complex topics into understandable pieces
-"""
+        prompt = _EXPLORE_PROMPT_TEMPLATE.format_map(
+            {
+                "question": question,
+                "system_context": self._system_context,
+                "results_preview": results_text[:500],
+                "context_summary": context_summary,
+                "project": self.project_path.name,
+                "results_text": results_text,
+            }
+        )
 
         return prompt
 
@@ -277,27 +528,10 @@ Guidelines:
         synthesis_time: float,
     ) -> str:
         """Format exploration response with context indicators."""
-
-        output = []
-
         # Header with session context
-        session_duration = time.time() - self.current_session.started_at
+        session_duration = self.current_session.elapsed()
         exchange_count = len(self.current_session.conversation_history)
 
-        output.append(f"🧠 EXPLORATION ANALYSIS (Question #{exchange_count})")
-        output.append(
-            f"Session: {session_duration/60:.1f}m | Results: {result_count} | "
-            f"Time: {search_time+synthesis_time:.1f}s"
-        )
-        output.append("=" * 60)
-        output.append("")
-
-        # Response was already displayed via streaming
-        # Just show completion status
-        output.append("✅ Analysis complete")
-        output.append("")
-        output.append("")
-
         # Confidence and context indicator
         confidence_emoji = (
             "🟢"
@@ -307,18 +541,28 @@ Guidelines:
         context_indicator = (
             f" | Context: {exchange_count-1} previous questions" if exchange_count > 1 else ""
         )
-        output.append(
-            f"{confidence_emoji} Confidence: {synthesis.confidence:.1%}{context_indicator}"
-        )
 
-        return "\n".join(output)
+        # Response was already displayed via streaming, so just show completion status
+        return "\n".join(
+            [
+                f"🧠 EXPLORATION ANALYSIS (Question #{exchange_count})",
+                f"Session: {session_duration/60:.1f}m | Results: {result_count} | "
+                f"Time: {search_time+synthesis_time:.1f}s",
+                "=" * 60,
+                "",
+                "✅ Analysis complete",
+                "",
+                "",
+                f"{confidence_emoji} Confidence: {synthesis.confidence:.1%}{context_indicator}",
+            ]
+        )
 
     def get_session_summary(self) -> str:
         """Get a summary of the current exploration session."""
         if not self.current_session:
             return "No active exploration session."
 
-        duration = time.time() - self.current_session.started_at
+        duration = self.current_session.elapsed()
         exchange_count = len(self.current_session.conversation_history)
 
         summary = [
@@ -355,7 +599,15 @@ Guidelines:
         return summary + "\n\n✅ Exploration session ended."
 
     def _check_model_restart_needed(self) -> bool:
-        """Check if model restart would improve thinking quality."""
+        """Check if model restart would improve thinking quality.
+
+        The probe costs a full generation, so its answer is remembered per
+        server and model until the model is actually restarted.
+        """
+        probe_key = (self.synthesizer.ollama_url, self.synthesizer.model)
+        if probe_key in _restart_probe_results:
+            return _restart_probe_results[probe_key]
+
         try:
             # Simple heuristic: if we can detect the model was recently used
             # with <no_think>, suggest restart for better thinking quality
@@ -367,8 +619,9 @@ Guidelines:
 
             if test_response:
                 # If response is suspiciously short or shows signs of no-think behavior
-                if len(test_response.strip()) < 10 or "4" == test_response.strip():
-                    return True
+                restart_needed = len(test_response.strip()) < 10 or "4" == test_response.strip()
+                _restart_probe_results[probe_key] = restart_needed
+                return restart_needed
 
         except Exception:
             pass
@@ -393,15 +646,14 @@ Guidelines:
             if response in ["y", "yes"]:
                 print("\n🔄 Stopping current model...")
 
-                # Use ollama stop command for clean model restart
-                import subprocess
-
+                # Unload via the HTTP API (keep_alive=0) rather than spawning the ollama CLI
                 try:
-                    subprocess.run(
-                        ["ollama", "stop", self.synthesizer.model],
+                    response = _ollama_session.post(
+                        f"{self.synthesizer.ollama_url}/api/generate",
+                        json={"model": self.synthesizer.model, "keep_alive": 0},
                         timeout=10,
-                        capture_output=True,
                     )
+                    response.raise_for_status()
 
                     print("✅ Model stopped successfully.")
                     print(
@@ -410,13 +662,16 @@ Guidelines:
 
                     # Reset synthesizer initialization to force fresh start
                     self.synthesizer._initialized = False
+                    _restart_probe_results.pop(
+                        (self.synthesizer.ollama_url, self.synthesizer.model), None
+                    )
                     return True
 
-                except subprocess.TimeoutExpired:
+                except requests.exceptions.Timeout:
                     print("⚠️  Model stop timed out, continuing anyway...")
                     return False
-                except FileNotFoundError:
-                    print("⚠️  'ollama' command not found, continuing with current model...")
+                except requests.exceptions.ConnectionError:
+                    print("⚠️  Could not reach Ollama, continuing with current model...")
                     return False
                 except Exception as e:
                     print(f"⚠️  Error stopping model: {e}")
@@ -434,8 +689,6 @@ Guidelines:
 
     def _call_ollama_with_thinking(self, prompt: str, temperature: float = 0.3) -> tuple:
         """Call Ollama with streaming for fast time-to-first-token."""
-        import requests
-
         try:
             # Use the synthesizer's model and connection
             model_to_use = self.synthesizer.model
@@ -457,6 +710,7 @@ Guidelines:
                 "model": model_to_use,
                 "prompt": final_prompt,
                 "stream": True,  # Enable streaming for fast response
+                "keep_alive": OLLAMA_KEEP_ALIVE,
                 "options": {
                     "temperature": temperature,
                     "top_p": optimal_params.get("top_p", 0.9),
@@ -468,7 +722,7 @@ Guidelines:
                 },
             }
 
-            response = requests.post(
+            response = _ollama_session.post(
                 f"{self.synthesizer.ollama_url}/api/generate",
                 json=payload,
                 stream=True,
@@ -476,27 +730,25 @@ Guidelines:
             )
 
             if response.status_code == 200:
-                # Collect streaming response
-                raw_response = ""
+                # Split thinking from the answer as chunks arrive
+                splitter = _ThinkingSplitter()
                 thinking_displayed = False
 
                 for line in response.iter_lines():
                     if line:
                         try:
-                            chunk_data = json.loads(line.decode("utf-8"))
+                            chunk_data = _json_loads(line)
                             chunk_text = chunk_data.get("response", "")
 
                             if chunk_text:
-                                raw_response += chunk_text
+                                thinking_text = splitter.feed(chunk_text)
 
                                 # Display thinking stream as it comes in
-                                if not thinking_displayed and "<think>" in raw_response:
-                                    # Start displaying thinking
-                                    self._start_thinking_display()
-                                    thinking_displayed = True
-
-                                if thinking_displayed:
-                                    self._stream_thinking_chunk(chunk_text)
+                                if thinking_text:
+                                    if not thinking_displayed:
+                                        self._start_thinking_display()
+                                        thinking_displayed = True
+                                    self._stream_thinking_chunk(thinking_text)
 
                             if chunk_data.get("done", False):
                                 break
@@ -508,8 +760,10 @@ Guidelines:
                 if thinking_displayed:
                     self._end_thinking_display()
 
-                # Extract thinking stream and final response
-                thinking_stream, final_response = self._extract_thinking(raw_response)
+                thinking_stream, final_response = splitter.finish()
+                if not splitter.saw_tags:
+                    # No <think> tags: fall back to spotting untagged reasoning
+                    thinking_stream, final_response = self._extract_thinking(final_response)
 
                 return final_response, thinking_stream
             else:
@@ -520,25 +774,12 @@ Guidelines:
             return None, None
 
     def _extract_thinking(self, raw_response: str) -> tuple:
-        """Extract thinking content from response."""
+        """Extract untagged thinking from a response that has no <think> tags."""
         thinking_stream = ""
         final_response = raw_response
 
-        # Look for thinking patterns
-        if "<think>" in raw_response and "</think>" in raw_response:
-            # Extract thinking content between tags
-            start_tag = raw_response.find("<think>")
-            end_tag = raw_response.find("</think>") + len("</think>")
-
-            if start_tag != -1 and end_tag != -1:
-                thinking_content = raw_response[start_tag + 7 : end_tag - 8]  # Remove tags
-                thinking_stream = thinking_content.strip()
-
-                # Remove thinking from final response
-                final_response = (raw_response[:start_tag] + raw_response[end_tag:]).strip()
-
-        # Alternative patterns for models that use different thinking formats
-        elif "Let me think" in raw_response or "I need to analyze" in raw_response:
+        # Patterns for models that think without tags
+        if "Let me think" in raw_response or "I need to analyze" in raw_response:
             # Simple heuristic: first paragraph might be thinking
             lines = raw_response.split("\n")
             potential_thinking = []
@@ -578,28 +819,10 @@ Guidelines:
         """Start the thinking stream display."""
         print("\n\033[2m\033[3m💭 AI Thinking:\033[0m")
         print("\033[2m\033[3m" + "─" * 40 + "\033[0m")
-        self._thinking_buffer = ""
-        self._in_thinking_tags = False
-
-    def _stream_thinking_chunk(self, chunk: str):
-        """Stream a chunk of thinking as it arrives."""
-
-        self._thinking_buffer += chunk
-
-        # Check if we're in thinking tags
-        if "<think>" in self._thinking_buffer and not self._in_thinking_tags:
-            self._in_thinking_tags = True
-            # Display everything after <think>
-            start_idx = self._thinking_buffer.find("<think>") + 7
-            thinking_content = self._thinking_buffer[start_idx:]
-            if thinking_content:
-                print(f"\033[2m\033[3m{thinking_content}\033[0m", end="", flush=True)
-        elif self._in_thinking_tags and "</think>" not in chunk:
-            # We're in thinking mode, display the chunk
-            print(f"\033[2m\033[3m{chunk}\033[0m", end="", flush=True)
-        elif "</think>" in self._thinking_buffer:
-            # End of thinking
-            self._in_thinking_tags = False
+
+    def _stream_thinking_chunk(self, thinking_text: str):
+        """Stream a piece of thinking text as it arrives."""
+        print(f"\033[2m\033[3m{thinking_text}\033[0m", end="", flush=True)
 
     def _end_thinking_display(self):
         """End the thinking stream display."""
@@ -11,23 +11,24 @@ Drop-in replacement for the original server with:
 - Mini-RAG-friendly status updates
 """
 
+import errno
 import json
 import logging
 import os
+import queue
 import socket
-import subprocess
 import sys
 import threading
 import time
-from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from rich import print as rprint
+import psutil
 
 # Rich console for beautiful output
 from rich.console import Console
-from rich.live import Live
 from rich.panel import Panel
 from rich.progress import (
     BarColumn,
@@ -49,14 +50,93 @@ if sys.platform == "win32":
     except (ImportError, OSError):
         pass
 
-from .indexer import ProjectIndexer
-from .ollama_embeddings import OllamaEmbedder as CodeEmbedder
+# The indexer, searcher and embedder pull in LanceDB, PyArrow and the
+# embedding stack; they are imported where the server builds them so the
+# client side (status checks, is_running) stays quick to import.
 from .performance import PerformanceMonitor
-from .search import CodeSearcher
+
+try:
+    import orjson
+
+    def _encode_json(data: dict) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    _json_loads = orjson.loads
+except ImportError:
+
+    def _encode_json(data: dict) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 console = Console()
 
+# Bind errors meaning another socket holds the port. With SO_EXCLUSIVEADDRUSE,
+# Windows reports a conflicting bind as WSAEACCES
+_ADDR_IN_USE_ERRNOS = {errno.EADDRINUSE}
+if sys.platform == "win32":
+    _ADDR_IN_USE_ERRNOS.update(
+        {getattr(errno, "WSAEADDRINUSE", 10048), getattr(errno, "WSAEACCES", 10013)}
+    )
+
+# Largest request body the server accepts
+MAX_MESSAGE_BYTES = 10_000_000
+
+# Liveness ping: a zero-length frame (never valid JSON) answered with one
+# raw byte, so frequent is_running() polls skip building and parsing JSON
+PING_REQUEST = b"\x00\x00\x00\x00"
+PING_REPLY = b"K"
+
+# Recent search responses kept for repeat queries (IDE integrations re-issue
+# the same search often); the index doesn't change while the server runs
+RESULT_CACHE_SIZE = 128
+RESULT_CACHE_TTL = 30.0  # seconds
+
+# Status callbacks may redraw UIs or push webhooks; bursts of updates are
+# coalesced so they fire at most this often (ready/failed are sent at once)
+STATUS_NOTIFY_INTERVAL = 0.2  # seconds
+
+
+def _recv_exact(sock: socket.socket, size: int, what: str) -> bytearray:
+    """Read exactly ``size`` bytes straight into one preallocated buffer."""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if not n:
+            raise ConnectionError(f"Connection closed while receiving {what}")
+        received += n
+    return buf
+
+
+def _send_message(sock: socket.socket, data: dict):
+    """Send a dict as length-prefixed UTF-8 JSON in a single write."""
+    body = _encode_json(data)
+    header = len(body).to_bytes(4, "big")
+    if not hasattr(sock, "sendmsg"):  # Windows
+        sock.sendall(header + body)
+        return
+
+    # Scatter-gather write: no copy of the body to prepend the header
+    sent = sock.sendmsg([header, body])
+    if sent < len(header):
+        sock.sendall(header[sent:])
+        sent = len(header)
+    if sent - len(header) < len(body):
+        sock.sendall(memoryview(body)[sent - len(header) :])
+
+
+def _receive_message(sock: socket.socket, max_size: Optional[int] = None) -> Dict[str, Any]:
+    """Receive a length-prefixed JSON message and decode it."""
+    length = int.from_bytes(_recv_exact(sock, 4, "length"), "big")
+    if length == 0:
+        return {"command": "ping"}
+    if max_size is not None and length > max_size:
+        raise ValueError(f"Message too large: {length} bytes")
+    return _json_loads(_recv_exact(sock, length, "data"))
+
 
 class ServerStatus:
     """Real-time server status tracking"""
@@ -67,6 +147,7 @@ class ServerStatus:
         self.message = "Starting server..."
         self.details = {}
         self.start_time = time.time()
+        self.started_monotonic = time.monotonic()  # Immune to clock adjustments
         self.ready = False
         self.error = None
         self.health_checks = {}
@@ -93,6 +174,10 @@ class ServerStatus:
         self.phase = "failed"
         self.message = f"Server failed: {error}"
 
+    def uptime(self) -> float:
+        """Seconds since the server started."""
+        return time.monotonic() - self.started_monotonic
+
     def get_status(self) -> Dict[str, Any]:
         """Get complete status as dict"""
         return {
@@ -101,7 +186,7 @@ class ServerStatus:
             "message": self.message,
             "ready": self.ready,
             "error": self.error,
-            "uptime": time.time() - self.start_time,
+            "uptime": self.uptime(),
             "health_checks": self.health_checks,
             "details": self.details,
         }
@@ -123,15 +208,32 @@ class FastRAGServer:
         self.socket = None
         self.query_count = 0
 
+        # (query, top_k) -> (expiry on the monotonic clock, serialized results)
+        self._result_cache: OrderedDict = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+
         # Status and monitoring
         self.status = ServerStatus()
         self.performance = PerformanceMonitor()
         self.health_check_interval = 30  # seconds
         self.last_health_check = 0
+        self._health_stop = threading.Event()
+        self._probe_vector = None  # Embedding reused by every health check
+
+        # Per-request log lines, printed by a background writer so client
+        # handlers never wait on Rich's console lock; dropped when full
+        self._log_q: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=1000)
 
-        # Threading
+        # Threading: a small pool for startup work, and a separate pool sized
+        # like asyncio's default so slow searches can't starve other clients
         self.executor = ThreadPoolExecutor(max_workers=3)
+        self.client_executor = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) + 4), thread_name_prefix="rag-client"
+        )
         self.status_callbacks = []
+        self._notify_lock = threading.Lock()
+        self._notify_timer: Optional[threading.Timer] = None
+        self._last_notify = 0.0
 
         # Progress tracking
         self.indexing_progress = None
@@ -141,7 +243,25 @@ class FastRAGServer:
         self.status_callbacks.append(callback)
 
     def _notify_status(self):
-        """Notify all status callbacks"""
+        """Notify all status callbacks, coalescing bursts of updates"""
+        final = self.status.ready or self.status.error is not None
+        with self._notify_lock:
+            if not final:
+                if self._notify_timer is not None:
+                    return  # The pending flush reports the latest status
+                wait = self._last_notify + STATUS_NOTIFY_INTERVAL - time.monotonic()
+                if wait > 0:
+                    self._notify_timer = threading.Timer(wait, self._flush_status)
+                    self._notify_timer.daemon = True
+                    self._notify_timer.start()
+                    return
+        self._flush_status()
+
+    def _flush_status(self):
+        """Send the current status to every callback"""
+        with self._notify_lock:
+            self._notify_timer = None
+            self._last_notify = time.monotonic()
         status = self.status.get_status()
         for callback in self.status_callbacks:
             try:
@@ -149,75 +269,93 @@ class FastRAGServer:
             except Exception as e:
                 logger.warning(f"Status callback failed: {e}")
 
-    def _kill_existing_server(self) -> bool:
-        """Kill any existing process using our port with better feedback"""
-        try:
-            self.status.update("port_check", 5, "Checking for existing servers...")
-            self._notify_status()
+    def _bind_port(self) -> socket.socket:
+        """Bind the server port, killing a previous server only if the bind fails."""
+        self.status.update("port_check", 5, "Claiming server port...")
+        self._notify_status()
 
-            # Quick port check first
-            test_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            test_sock.settimeout(1.0)  # Faster timeout
-            result = test_sock.connect_ex(("localhost", self.port))
-            test_sock.close()
+        try:
+            return self._create_bound_socket()
+        except OSError as e:
+            if e.errno not in _ADDR_IN_USE_ERRNOS:
+                raise
 
-            if result != 0:  # Port is free
-                return True
+        self._kill_existing_server()
+        try:
+            sock = self._create_bound_socket()
+        except OSError as e:
+            raise RuntimeError(f"Failed to free port {self.port}: {e}")
+        console.print(f"[green]✅ Port {self.port} cleared[/green]")
+        return sock
+
+    def _create_bound_socket(self) -> socket.socket:
+        """Create a TCP socket bound to the server port."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if sys.platform == "win32":
+            # SO_REUSEADDR on Windows lets a bind share a port another socket
+            # is listening on, so a stale server would never be noticed
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("localhost", self.port))
+        except OSError:
+            sock.close()
+            raise
+        return sock
 
+    def _kill_existing_server(self) -> bool:
+        """Kill any existing process using our port with better feedback"""
+        try:
             console.print(f"[yellow]⚠️  Port {self.port} is occupied, clearing it...[/yellow]")
             self.status.update("port_cleanup", 10, f"Clearing port {self.port}...")
             self._notify_status()
 
-            if sys.platform == "win32":
-                # Windows: Enhanced process killing
-                cmd = ["netstat", "-ano"]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-
-                for line in result.stdout.split("\n"):
-                    if f":{self.port}" in line and "LISTENING" in line:
-                        parts = line.split()
-                        if len(parts) >= 5:
-                            pid = parts[-1]
-                            console.print(f"[dim]Killing process {pid}[/dim]")
-                            subprocess.run(
-                                ["taskkill", "/PID", pid, "/F"],
-                                capture_output=True,
-                                timeout=3,
-                            )
-                            time.sleep(0.5)  # Reduced wait time
-                            break
-            else:
-                # Unix/Linux: Enhanced process killing
-                result = subprocess.run(
-                    ["lsof", "-ti", f":{self.port}"],
-                    capture_output=True,
-                    text=True,
-                    timeout=3,
-                )
-                if result.stdout.strip():
-                    pids = result.stdout.strip().split()
-                    for pid in pids:
-                        console.print(f"[dim]Killing process {pid}[/dim]")
-                        subprocess.run(["kill", "-9", pid], capture_output=True)
-                    time.sleep(0.5)
-
-            # Verify port is free
-            test_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            test_sock.settimeout(1.0)
-            result = test_sock.connect_ex(("localhost", self.port))
-            test_sock.close()
-
-            if result == 0:
-                raise RuntimeError(f"Failed to free port {self.port}")
-
-            console.print(f"[green]✅ Port {self.port} cleared[/green]")
+            procs = []
+            for pid in self._port_owner_pids():
+                try:
+                    proc = psutil.Process(pid)
+                    console.print(f"[dim]Killing process {pid}[/dim]")
+                    proc.kill()
+                    procs.append(proc)
+                except psutil.NoSuchProcess:
+                    continue
+
+            # Wait for the kernel to release the port rather than a fixed sleep
+            psutil.wait_procs(procs, timeout=3)
             return True
 
-        except subprocess.TimeoutExpired:
-            raise RuntimeError("Timeout while clearing port")
         except Exception as e:
             raise RuntimeError(f"Failed to clear port {self.port}: {e}")
 
+    def _port_owner_pids(self) -> set:
+        """PIDs of processes listening on our port."""
+
+        def listening(conn) -> bool:
+            return (
+                conn.status == psutil.CONN_LISTEN
+                and bool(conn.laddr)
+                and conn.laddr.port == self.port
+            )
+
+        try:
+            return {
+                c.pid for c in psutil.net_connections(kind="inet") if listening(c) and c.pid
+            }
+        except psutil.AccessDenied:
+            # macOS only lists every socket for root; a stale server is ours anyway
+            pids = set()
+            for proc in psutil.process_iter():
+                try:
+                    conns = (getattr(proc, "net_connections", None) or proc.connections)(
+                        "inet"
+                    )
+                except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+                    continue
+                if any(listening(c) for c in conns):
+                    pids.add(proc.pid)
+            return pids
+
     def _check_indexing_needed(self) -> bool:
         """Quick check if indexing is needed"""
         rag_dir = self.project_path / ".mini-rag"
@@ -252,6 +390,8 @@ class FastRAGServer:
             self.status.update("indexing", 20, "Initializing indexer...")
             self._notify_status()
 
+            from .indexer import ProjectIndexer
+
             # Create indexer with optimized settings
             self.indexer = ProjectIndexer(
                 self.project_path,
@@ -271,65 +411,27 @@ class FastRAGServer:
                 refresh_per_second=10,  # More responsive updates
             ) as progress:
 
-                # Override indexer's progress reporting
-                original_index_project = self.indexer.index_project
-
-                def enhanced_index_project(*args, **kwargs):
-                    # Get files to index first
-                    files_to_index = self.indexer._get_files_to_index()
-                    total_files = len(files_to_index)
-
-                    if total_files == 0:
-                        self.status.update("indexing", 80, "Index up to date")
-                        return {
-                            "files_indexed": 0,
-                            "chunks_created": 0,
-                            "time_taken": 0,
-                        }
-
-                    task = progress.add_task(
-                        f"[cyan]Indexing {total_files} files...", total=total_files
-                    )
-
-                    # Track progress by hooking into the processor
-                    processed_count = 0
-
-                    def track_progress():
-                        nonlocal processed_count
-                        while processed_count < total_files and self.running:
-                            time.sleep(0.1)  # Fast polling
-                            current_progress = (processed_count / total_files) * 60 + 20
-                            self.status.update(
-                                "indexing",
-                                current_progress,
-                                f"Indexed {processed_count}/{total_files} files",
-                            )
-                            progress.update(task, completed=processed_count)
-                            self._notify_status()
-
-                    # Start progress tracking
-                    progress_thread = threading.Thread(target=track_progress)
-                    progress_thread.daemon = True
-                    progress_thread.start()
-
-                    # Hook into the processing
-                    original_process_file = self.indexer._process_file
-
-                    def tracked_process_file(*args, **kwargs):
-                        nonlocal processed_count
-                        result = original_process_file(*args, **kwargs)
-                        processed_count += 1
-                        return result
-
-                    self.indexer._process_file = tracked_process_file
-
-                    # Run the actual indexing
-                    stats = original_index_project(*args, **kwargs)
-
-                    progress.update(task, completed=total_files)
-                    return stats
-
-                self.indexer.index_project = enhanced_index_project
+                task = None
+
+                # The indexer reports each finished file from its own loop, so
+                # no wrapper around _process_file or polling thread is needed
+                def on_progress(files_done: int, files_total: int, chunks_so_far: int):
+                    nonlocal task
+                    if task is None:
+                        task = progress.add_task(
+                            f"[cyan]Indexing {files_total} files...", total=files_total
+                        )
+                    progress.update(task, completed=files_done)
+                    # Batch status notifications rather than one per file
+                    if files_done % 8 == 0 or files_done == files_total:
+                        self.status.update(
+                            "indexing",
+                            (files_done / files_total) * 60 + 20,
+                            f"Indexed {files_done}/{files_total} files",
+                        )
+                        self._notify_status()
+
+                self.indexer.set_progress_callback(on_progress)
 
                 # Run indexing
                 stats = self.indexer.index_project(force_reindex=False)
@@ -379,17 +481,34 @@ class FastRAGServer:
                 def load_embedder():
                     self.status.update("embedder", 25, "Loading embedding model...")
                     self._notify_status()
+                    from .ollama_embeddings import OllamaEmbedder as CodeEmbedder
+
                     self.embedder = CodeEmbedder()
                     self.embedder.warmup()  # Pre-warm the model
                     progress.update(embedder_task, completed=100)
                     self.status.update("embedder", 50, "Embedding model loaded")
                     self._notify_status()
 
-                # Start embedder loading in background
+                def open_database():
+                    # Importing LanceDB and opening the index is mostly I/O, so
+                    # it overlaps with the (CPU/network bound) embedder load
+                    try:
+                        import lancedb
+                    except ImportError:
+                        return None  # CodeSearcher reports the missing dependency
+                    return lancedb.connect(self.project_path / ".mini-rag")
+
+                # Start embedder loading in background, opening an existing
+                # index alongside it (a fresh index is only ready after indexing)
                 embedder_future = self.executor.submit(load_embedder)
+                db_future = None if needs_indexing else self.executor.submit(open_database)
 
-                # Wait for embedder to finish (this is the bottleneck)
-                embedder_future.result(timeout=120)  # 2 minute timeout
+                # Wait for both; the embedder is the bottleneck
+                futures = [f for f in (embedder_future, db_future) if f is not None]
+                if wait(futures, timeout=120).not_done:  # 2 minute timeout
+                    raise TimeoutError("Timed out loading the embedding model")
+                embedder_future.result()
+                db = db_future.result() if db_future is not None else None
 
                 # Task 2: Handle indexing if needed
                 if needs_indexing and self.auto_index:
@@ -401,7 +520,9 @@ class FastRAGServer:
                 self.status.update("searcher", 85, "Connecting to database...")
                 self._notify_status()
 
-                self.searcher = CodeSearcher(self.project_path, embedder=self.embedder)
+                from .search import CodeSearcher
+
+                self.searcher = CodeSearcher(self.project_path, embedder=self.embedder, db=db)
                 progress.update(searcher_task, completed=100)
 
                 self.status.update("searcher", 95, "Database connected")
@@ -425,31 +546,41 @@ class FastRAGServer:
         checks = {}
 
         try:
-            # Check 1: Embedder functionality
+            # Check 1: Embedder functionality. The probe vector is embedded once
+            # and reused, so periodic checks don't pay for a forward pass
             if self.embedder:
-                test_embedding = self.embedder.embed_code("def test(): pass")
+                if self._probe_vector is None:
+                    self._probe_vector = self.embedder.embed_code("def test(): pass")
                 checks["embedder"] = {
                     "status": "healthy",
-                    "embedding_dim": len(test_embedding),
+                    "embedding_dim": len(self._probe_vector),
                     "model": getattr(self.embedder, "model_name", "unknown"),
                 }
             else:
                 checks["embedder"] = {"status": "missing"}
 
-            # Check 2: Database connectivity
+            # Check 2: Database connectivity, from a row count and a language-only
+            # scan rather than loading every chunk and vector into pandas
             if self.searcher:
-                stats = self.searcher.get_statistics()
+                table = self.searcher.table
+                chunks = table.count_rows()
+                languages = set()
+                if chunks:
+                    scan = table.search().select(["language"]).limit(chunks).to_arrow()
+                    languages = set(scan["language"].to_pylist())
                 checks["database"] = {
                     "status": "healthy",
-                    "chunks": stats.get("total_chunks", 0),
-                    "languages": len(stats.get("languages", {})),
+                    "chunks": chunks,
+                    "languages": len(languages),
                 }
             else:
                 checks["database"] = {"status": "missing"}
 
-            # Check 3: Search functionality
-            if self.searcher:
-                test_results = self.searcher.search("test query", top_k=1)
+            # Check 3: Search functionality, as a one-row vector query
+            if self.searcher and self._probe_vector is not None:
+                test_results = (
+                    self.searcher.table.search(self._probe_vector).limit(1).to_list()
+                )
                 checks["search"] = {
                     "status": "healthy",
                     "test_results": len(test_results),
@@ -457,14 +588,17 @@ class FastRAGServer:
             else:
                 checks["search"] = {"status": "unavailable"}
 
-            # Check 4: Port availability
-            try:
-                test_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                test_sock.bind(("localhost", self.port))
-                test_sock.close()
+            # Check 4: Port availability (held by us once start() has bound it)
+            if self.socket is not None:
                 checks["port"] = {"status": "available"}
-            except (ConnectionError, OSError, TypeError, ValueError, socket.error):
-                checks["port"] = {"status": "occupied"}
+            else:
+                try:
+                    test_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    test_sock.bind(("localhost", self.port))
+                    test_sock.close()
+                    checks["port"] = {"status": "available"}
+                except (ConnectionError, OSError, TypeError, ValueError, socket.error):
+                    checks["port"] = {"status": "occupied"}
 
         except Exception as e:
             checks["health_check_error"] = str(e)
@@ -492,22 +626,20 @@ class FastRAGServer:
         try:
             start_time = time.time()
 
-            # Step 1: Clear existing servers
-            if not self._kill_existing_server():
-                return False
+            # Step 1: Claim the port, clearing an old server only if it's taken.
+            # Connections are refused until listen() below, once we're ready
+            self.socket = self._bind_port()
 
             # Step 2: Initialize all components
             if not self._initialize_components():
+                self.socket.close()
                 return False
 
             # Step 3: Start network server
             self.status.update("server", 98, "Starting network server...")
             self._notify_status()
 
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket.bind(("localhost", self.port))
-            self.socket.listen(10)  # Increased backlog
+            self.socket.listen(socket.SOMAXCONN)  # Queue bursts while workers are busy
 
             self.running = True
 
@@ -547,16 +679,20 @@ class FastRAGServer:
         """Main server loop with enhanced monitoring"""
         console.print("[dim]Waiting for connections... Press Ctrl+C to stop[/dim]\n")
 
+        # Periodic health checks run on their own timer, not on client arrivals
+        threading.Thread(
+            target=self._health_check_loop, name="rag-health", daemon=True
+        ).start()
+        threading.Thread(target=self._log_worker, name="rag-log", daemon=True).start()
+
         while self.running:
             try:
                 client, addr = self.socket.accept()
+                # Replies are single writes; don't let Nagle hold them back
+                client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
                 # Handle in thread pool for better performance
-                self.executor.submit(self._handle_client, client)
-
-                # Periodic health checks
-                if time.time() - self.last_health_check > self.health_check_interval:
-                    self.executor.submit(self._run_health_checks)
+                self.client_executor.submit(self._handle_client, client)
 
             except KeyboardInterrupt:
                 break
@@ -565,64 +701,49 @@ class FastRAGServer:
                     logger.error(f"Server error: {e}")
                     console.print(f"[red]Server error: {e}[/red]")
 
+    def _health_check_loop(self):
+        """Re-run health checks every ``health_check_interval`` seconds until stopped."""
+        while not self._health_stop.wait(self.health_check_interval):
+            try:
+                self._run_health_checks()
+            except Exception as e:
+                logger.warning(f"Periodic health check failed: {e}")
+
+    def _log_request(self, message: str):
+        """Queue a per-request console line without blocking the handler."""
+        try:
+            self._log_q.put_nowait(message)
+        except queue.Full:
+            pass
+
+    def _log_worker(self):
+        """Print queued request lines, draining up to 32 per console write."""
+        while True:
+            message = self._log_q.get()
+            if message is None:
+                return
+            batch = [message]
+            while len(batch) < 32:
+                try:
+                    message = self._log_q.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    console.print("\n".join(batch))
+                    return
+                batch.append(message)
+            console.print("\n".join(batch))
+
     def _handle_client(self, client: socket.socket):
         """Enhanced client handling with better error reporting"""
         try:
             # Receive with timeout
             client.settimeout(30.0)  # 30 second timeout
-            data = self._receive_json(client)
-            request = json.loads(data)
-
-            # Handle different request types
-            if request.get("command") == "shutdown":
-                console.print("\n[yellow]🛑 Shutdown requested[/yellow]")
-                response = {"success": True, "message": "Server shutting down"}
-                self._send_json(client, response)
-                self.stop()
-                return
-
-            if request.get("command") == "status":
-                response = {"success": True, "status": self.status.get_status()}
-                self._send_json(client, response)
-                return
-
-            # Handle search requests
-            query = request.get("query", "")
-            top_k = request.get("top_k", 10)
-
-            if not query:
-                raise ValueError("Empty query")
-
-            self.query_count += 1
-
-            # Enhanced query logging
-            console.print(
-                f"[blue]🔍 Query #{self.query_count}:[/blue] [dim]{query[:50]}{'...' if len(query) > 50 else ''}[/dim]"
-            )
-
-            # Perform search with timing
-            start = time.time()
-            results = self.searcher.search(query, top_k=top_k)
-            search_time = time.time() - start
-
-            # Enhanced response
-            response = {
-                "success": True,
-                "query": query,
-                "count": len(results),
-                "search_time_ms": int(search_time * 1000),
-                "results": [r.to_dict() for r in results],
-                "server_uptime": int(time.time() - self.status.start_time),
-                "total_queries": self.query_count,
-                "server_status": "ready",
-            }
-
-            self._send_json(client, response)
+            request = self._receive_json(client)
 
-            # Enhanced result logging
-            console.print(
-                f"[green]✅ {len(results)} results in {search_time*1000:.0f}ms[/green]"
-            )
+            # Dispatch on the command; requests without one are searches
+            handler = self._COMMANDS.get(request.get("command"), FastRAGServer._cmd_search)
+            handler(self, request, client)
 
         except Exception as e:
             error_msg = str(e)
@@ -640,51 +761,114 @@ class FastRAGServer:
             except (TypeError, ValueError):
                 pass
 
-            console.print(f"[red]❌ Query failed: {error_msg}[/red]")
+            self._log_request(f"[red]❌ Query failed: {error_msg}[/red]")
         finally:
             try:
                 client.close()
             except (ConnectionError, OSError, TypeError, ValueError, socket.error):
                 pass
 
-    def _receive_json(self, sock: socket.socket) -> str:
+    def _cmd_shutdown(self, request: dict, client: socket.socket):
+        """Acknowledge a shutdown request, then stop the server."""
+        console.print("\n[yellow]🛑 Shutdown requested[/yellow]")
+        response = {"success": True, "message": "Server shutting down"}
+        self._send_json(client, response)
+        self.stop()
+
+    def _cmd_ping(self, request: dict, client: socket.socket):
+        """Answer a liveness ping without any JSON."""
+        client.sendall(PING_REPLY)
+
+    def _cmd_status(self, request: dict, client: socket.socket):
+        """Reply with the current server status."""
+        response = {"success": True, "status": self.status.get_status()}
+        self._send_json(client, response)
+
+    def _cmd_search(self, request: dict, client: socket.socket):
+        """Run a search request and reply with the results."""
+        query = request.get("query", "")
+        top_k = request.get("top_k", 10)
+
+        if not query:
+            raise ValueError("Empty query")
+
+        self.query_count += 1
+
+        # Enhanced query logging
+        self._log_request(
+            f"[blue]🔍 Query #{self.query_count}:[/blue] [dim]{query[:50]}{'...' if len(query) > 50 else ''}[/dim]"
+        )
+
+        # Streaming clients get a frame before the search starts, then one
+        # frame per result, so no single reply holds every chunk's text
+        stream = bool(request.get("stream"))
+        if stream:
+            self._send_json(client, {"event": "ready", "query": query})
+
+        # Perform search with timing
+        start = time.time()
+        results = self._cached_search(query, top_k)
+        search_time = time.time() - start
+
+        # Enhanced response
+        response = {
+            "success": True,
+            "query": query,
+            "count": len(results),
+            "search_time_ms": int(search_time * 1000),
+            "server_uptime": int(self.status.uptime()),
+            "total_queries": self.query_count,
+            "server_status": "ready",
+        }
+
+        if stream:
+            for result in results:
+                self._send_json(client, {"event": "result", "result": result})
+            self._send_json(client, {"event": "done", **response})
+        else:
+            self._send_json(client, {**response, "results": results})
+
+        # Enhanced result logging
+        self._log_request(
+            f"[green]✅ {len(results)} results in {search_time*1000:.0f}ms[/green]"
+        )
+
+    # Request handlers by "command" field
+    _COMMANDS: Dict[str, Callable[["FastRAGServer", dict, socket.socket], None]] = {
+        "ping": _cmd_ping,
+        "shutdown": _cmd_shutdown,
+        "status": _cmd_status,
+    }
+
+    def _cached_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Search and serialize results, reusing them for recent repeat queries."""
+        key = (query.strip(), top_k)
+        now = time.monotonic()
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None and cached[0] > now:
+                self._result_cache.move_to_end(key)
+                return cached[1]
+
+        results = [r.to_dict() for r in self.searcher.search(query, top_k=top_k)]
+
+        with self._result_cache_lock:
+            self._result_cache[key] = (now + RESULT_CACHE_TTL, results)
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return results
+
+    def _receive_json(self, sock: socket.socket) -> Dict[str, Any]:
         """Receive JSON with length prefix and timeout handling"""
         try:
-            # Receive length (4 bytes)
-            length_data = b""
-            while len(length_data) < 4:
-                chunk = sock.recv(4 - len(length_data))
-                if not chunk:
-                    raise ConnectionError("Connection closed while receiving length")
-                length_data += chunk
-
-            length = int.from_bytes(length_data, "big")
-            if length > 10_000_000:  # 10MB limit
-                raise ValueError(f"Message too large: {length} bytes")
-
-            # Receive data
-            data = b""
-            while len(data) < length:
-                chunk = sock.recv(min(65536, length - len(data)))
-                if not chunk:
-                    raise ConnectionError("Connection closed while receiving data")
-                data += chunk
-
-            return data.decode("utf-8")
+            return _receive_message(sock, max_size=MAX_MESSAGE_BYTES)
         except socket.timeout:
             raise ConnectionError("Timeout while receiving data")
 
     def _send_json(self, sock: socket.socket, data: dict):
         """Send JSON with length prefix"""
-        json_str = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
-        json_bytes = json_str.encode("utf-8")
-
-        # Send length prefix
-        length = len(json_bytes)
-        sock.send(length.to_bytes(4, "big"))
-
-        # Send data
-        sock.sendall(json_bytes)
+        _send_message(sock, data)
 
     def stop(self):
         """Graceful server shutdown"""
@@ -698,8 +882,16 @@ class FastRAGServer:
             except (ConnectionError, OSError, TypeError, ValueError, socket.error):
                 pass
 
-        # Shutdown executor
-        self.executor.shutdown(wait=True, timeout=5.0)
+        self._health_stop.set()
+        try:
+            self._log_q.put_nowait(None)  # Let the log writer flush and exit
+        except queue.Full:
+            pass
+
+        # Shutdown executors without waiting: a shutdown request runs stop()
+        # on a client worker, which would otherwise wait on itself
+        self.executor.shutdown(wait=False)
+        self.client_executor.shutdown(wait=False)
 
         console.print("[green]✅ Server stopped gracefully[/green]")
 
@@ -717,15 +909,12 @@ class FastRAGClient:
     def search(self, query: str, top_k: int = 10) -> Dict[str, Any]:
         """Enhanced search with better error handling"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            sock.connect(("localhost", self.port))
+            sock = self._connect(self.timeout)
 
             request = {"query": query, "top_k": top_k}
             self._send_json(sock, request)
 
-            data = self._receive_json(sock)
-            response = json.loads(data)
+            response = self._receive_json(sock)
 
             sock.close()
             return response
@@ -745,18 +934,37 @@ class FastRAGClient:
         except Exception as e:
             return {"success": False, "error": str(e), "error_type": type(e).__name__}
 
+    def search_stream(self, query: str, top_k: int = 10) -> Iterator[Dict[str, Any]]:
+        """Yield search results one at a time as the server sends them.
+
+        Unlike search(), connection problems and server errors are raised
+        rather than returned, since results may already have been yielded.
+        """
+        sock = self._connect(self.timeout)
+        try:
+            self._send_json(sock, {"query": query, "top_k": top_k, "stream": True})
+
+            while True:
+                frame = self._receive_json(sock)
+                event = frame.get("event")
+                if event == "result":
+                    yield frame["result"]
+                elif event == "done":
+                    return
+                elif event != "ready":
+                    raise RuntimeError(frame.get("error", "Unexpected reply from RAG server"))
+        finally:
+            sock.close()
+
     def get_status(self) -> Dict[str, Any]:
         """Get detailed server status"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5.0)
-            sock.connect(("localhost", self.port))
+            sock = self._connect(5.0)
 
             request = {"command": "status"}
             self._send_json(sock, request)
 
-            data = self._receive_json(sock)
-            response = json.loads(data)
+            response = self._receive_json(sock)
 
             sock.close()
             return response
@@ -765,25 +973,28 @@ class FastRAGClient:
             return {"success": False, "error": str(e), "server_running": False}
 
     def is_running(self) -> bool:
-        """Enhanced server detection"""
+        """Check the server is up with a raw ping rather than a status request"""
+        try:
+            sock = self._connect(5.0)
+        except OSError:
+            return False
         try:
-            status = self.get_status()
-            return status.get("success", False)
-        except (TypeError, ValueError):
+            sock.sendall(PING_REQUEST)
+            return sock.recv(1) == PING_REPLY
+        except OSError:
             return False
+        finally:
+            sock.close()
 
     def shutdown(self) -> Dict[str, Any]:
         """Gracefully shutdown server"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(10.0)
-            sock.connect(("localhost", self.port))
+            sock = self._connect(10.0)
 
             request = {"command": "shutdown"}
             self._send_json(sock, request)
 
-            data = self._receive_json(sock)
-            response = json.loads(data)
+            response = self._receive_json(sock)
 
             sock.close()
             return response
@@ -791,36 +1002,25 @@ class FastRAGClient:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def _connect(self, timeout: float) -> socket.socket:
+        """Connect to the server with Nagle's algorithm disabled."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(("localhost", self.port))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
     def _send_json(self, sock: socket.socket, data: dict):
         """Send JSON with length prefix"""
-        json_str = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
-        json_bytes = json_str.encode("utf-8")
-
-        length = len(json_bytes)
-        sock.send(length.to_bytes(4, "big"))
-        sock.sendall(json_bytes)
+        _send_message(sock, data)
 
-    def _receive_json(self, sock: socket.socket) -> str:
+    def _receive_json(self, sock: socket.socket) -> Dict[str, Any]:
         """Receive JSON with length prefix"""
-        # Receive length
-        length_data = b""
-        while len(length_data) < 4:
-            chunk = sock.recv(4 - len(length_data))
-            if not chunk:
-                raise ConnectionError("Connection closed")
-            length_data += chunk
-
-        length = int.from_bytes(length_data, "big")
-
-        # Receive data
-        data = b""
-        while len(data) < length:
-            chunk = sock.recv(min(65536, length - len(data)))
-            if not chunk:
-                raise ConnectionError("Connection closed")
-            data += chunk
-
-        return data.decode("utf-8")
+        return _receive_message(sock)
 
 
 def start_fast_server(project_path: Path, port: int = 7777, auto_index: bool = True):
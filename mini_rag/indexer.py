@@ -3,21 +3,24 @@ Parallel indexing engine for efficient codebase processing.
 Handles file discovery, chunking, embedding, and storage.
 """
 
+import fnmatch
 import hashlib
 import json
 import logging
+import math
 import os
+import re
 import threading
 import warnings
 
 warnings.filterwarnings("ignore", message="table_names.*deprecated", category=DeprecationWarning)
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
-from pathlib import Path
+from functools import lru_cache
+from pathlib import Path, PureWindowsPath
 from typing import Any, Dict, List, Optional
 
 import numpy as np
-import pandas as pd
 from rich.console import Console
 from rich.progress import (
     BarColumn,
@@ -38,6 +41,30 @@ except ImportError:
     pa = None
     LANCEDB_AVAILABLE = False
 
+try:
+    import orjson
+
+    def _encode_json(data: dict) -> bytes:
+        return orjson.dumps(data)
+
+    _json_loads = orjson.loads
+except ImportError:
+
+    def _encode_json(data: dict) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _json_loads = json.loads
+
+# Change detection only needs a fast content tripwire, not a cryptographic
+# digest; xxh3 is used when available, otherwise SHA-256
+try:
+    import xxhash
+
+    HASH_ALGO = "xxh3"
+except ImportError:
+    xxhash = None
+    HASH_ALGO = "sha256"
+
 from .chunker import CodeChunker
 from .ollama_embeddings import OllamaEmbedder as CodeEmbedder
 from .path_handler import normalize_path, normalize_relative_path
@@ -45,6 +72,177 @@ from .path_handler import normalize_path, normalize_relative_path
 logger = logging.getLogger(__name__)
 console = Console()
 
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+
+
+@lru_cache(maxsize=8)
+def _compile_exclude_patterns(patterns: tuple) -> "re.Pattern":
+    """Compile exclude patterns into one regex searched against a path or name.
+
+    Plain patterns match anywhere as substrings; glob patterns (``*.pyc``)
+    match the end of the path.
+    """
+    if not patterns:
+        return re.compile(r"(?!)")  # Matches nothing
+    return re.compile(
+        "|".join(
+            fnmatch.translate(p) if any(c in p for c in "*?[") else re.escape(p)
+            for p in patterns
+        )
+    )
+
+
+@lru_cache(maxsize=8)
+def _split_include_patterns(patterns: tuple, fold_case: bool = False) -> tuple:
+    """Split include patterns into (suffixes, names, other globs).
+
+    ``*.ext`` patterns become a suffix set and literal names a name set, so
+    most files are settled by a set lookup instead of a Path.match per
+    pattern; anything else is still matched as a glob. With ``fold_case``
+    the sets are lowercased, for paths whose match ignores case (Windows).
+    """
+    suffixes, names, globs = set(), set(), []
+    for pattern in patterns:
+        if fold_case:
+            pattern = pattern.lower()
+        rest = pattern[1:]
+        if (
+            pattern.startswith("*.")
+            and rest.count(".") == 1
+            and not any(c in rest for c in "*?[/")
+        ):
+            suffixes.add(rest)
+        elif not any(c in pattern for c in "*?[/"):
+            names.add(pattern)
+        else:
+            globs.append(pattern)
+    return frozenset(suffixes), frozenset(names), tuple(globs)
+
+
+# Lowercase markers of code or configuration in an extensionless file's
+# first 1KB, matched literally in one pass
+_EXTENSIONLESS_INDICATORS = re.compile(
+    b"|".join(
+        re.escape(indicator)
+        for indicator in (
+            # Code
+            b"#!/usr/bin/env python",
+            b"#!/usr/bin/python",
+            b"#!.*python",
+            b"import ",
+            b"from ",
+            b"def ",
+            b"class ",
+            b"if __name__",
+            b"function ",
+            b"var ",
+            b"const ",
+            b"let ",
+            b"package main",
+            b"public class",
+            b"private class",
+            b"public static void",
+            # Configuration
+            b"#!/bin/bash",
+            b"#!/bin/sh",
+            b"[",
+            b"version =",
+            b"name =",
+            b"description =",
+            b"author =",
+            b"<configuration>",
+            b"<?xml",
+        )
+    )
+)
+
+
+@lru_cache(maxsize=4096)
+def _sniff_extensionless_file(path: str, size: int, mtime_ns: int) -> bool:
+    """Check whether an extensionless file looks like text code or config.
+
+    Cached by size and mtime, so an unchanged file is only read once.
+    """
+    try:
+        with open(path, "rb") as f:
+            first_chunk = f.read(1024)
+        first_chunk.decode("utf-8")  # Binary files are skipped
+    except (OSError, UnicodeDecodeError):
+        return False
+    return _EXTENSIONLESS_INDICATORS.search(first_chunk.lower()) is not None
+
+
+# Chunks gathered from several files before one embedding call, so the
+# embedder sees full batches rather than a handful of chunks per file
+EMBED_BATCH_CHUNKS = 64
+
+# Records buffered before they are written to the table, which bounds
+# indexing memory regardless of project size
+FLUSH_RECORDS = 5000
+
+# Removed files whose chunks are dropped by a single delete predicate
+DELETE_BATCH_FILES = 500
+
+# Embedding requests kept in flight while indexing. They wait on the
+# embedding server rather than the CPU, so this is sized separately from
+# (and above) the file reader pool, which the GIL bounds
+EMBED_WORKERS = 8
+
+# Tables at least this large get an IVF_PQ vector index after a bulk load;
+# below it, brute-force search is fast and PQ has too few rows to train on
+VECTOR_INDEX_MIN_ROWS = 10_000
+
+
+class RecordColumns:
+    """Chunk records held column-wise until they are written to the table.
+
+    Keeping one list per column (and one embedding block per file) avoids
+    building a dict per chunk, and maps straight onto Arrow columns.
+    """
+
+    NAMES = (
+        "file_path",
+        "absolute_path",
+        "chunk_id",
+        "content",
+        "start_line",
+        "end_line",
+        "chunk_type",
+        "name",
+        "language",
+        "indexed_at",
+        "file_lines",
+        "chunk_index",
+        "total_chunks",
+        "parent_class",
+        "parent_function",
+        "prev_chunk_id",
+        "next_chunk_id",
+    )
+
+    def __init__(self):
+        self.columns: Dict[str, list] = {name: [] for name in self.NAMES}
+        self.embeddings: List[np.ndarray] = []  # 2-D float32 blocks
+        # Manifest entries for the files these rows came from, applied
+        # once the rows are written
+        self.files: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns["file_path"])
+
+    def extend(self, other: "RecordColumns"):
+        """Append all rows of another set of columns."""
+        for name, values in self.columns.items():
+            values.extend(other.columns[name])
+        self.embeddings.extend(other.embeddings)
+        self.files.update(other.files)
+
+    def embedding_matrix(self) -> np.ndarray:
+        """Return all embeddings as a single (rows, dim) float32 array."""
+        if len(self.embeddings) == 1:
+            return self.embeddings[0]
+        return np.concatenate(self.embeddings)
+
 
 class ProjectIndexer:
     """Indexes a project directory for semantic search."""
@@ -55,6 +253,7 @@ class ProjectIndexer:
         embedder: Optional[CodeEmbedder] = None,
         chunker: Optional[CodeChunker] = None,
         max_workers: int = 4,
+        embed_workers: int = EMBED_WORKERS,
     ):
         """
         Initialize the indexer.
@@ -63,7 +262,8 @@ class ProjectIndexer:
             project_path: Path to the project to index
             embedder: CodeEmbedder instance (creates one if not provided)
             chunker: CodeChunker instance (creates one if not provided)
-            max_workers: Number of parallel workers for indexing
+            max_workers: Number of parallel workers reading and chunking files
+            embed_workers: Number of embedding requests kept in flight
         """
         self.project_path = Path(project_path).resolve()
         self.rag_dir = self.project_path / ".mini-rag"
@@ -79,11 +279,18 @@ class ProjectIndexer:
         )
         self.chunker = chunker or CodeChunker()
         self.max_workers = max_workers
+        self.embed_workers = embed_workers
 
         # Cancellation and progress support
         self._cancel_event = threading.Event()
         self._progress_callback = None  # fn(files_done, files_total, chunks_so_far)
 
+        # Digests taken by _needs_reindex, keyed by (path, size, mtime_ns)
+        self._hash_cache: Dict[tuple, str] = {}
+        # Manifest keys worked out by the project walk, so files queued for
+        # indexing aren't resolved against the project root again
+        self._relative_paths: Dict[Path, str] = {}
+
         # File patterns to include/exclude
         self.include_patterns = [
             # Code files
@@ -195,13 +402,19 @@ class ProjectIndexer:
         """Load existing manifest or create new one."""
         if self.manifest_path.exists():
             try:
-                with open(self.manifest_path, "r") as f:
-                    return json.load(f)
+                manifest = _json_loads(self.manifest_path.read_bytes())
+                # Totals are kept current from here on, but older versions
+                # only refreshed them after a full index run
+                files = manifest.setdefault("files", {})
+                manifest["file_count"] = len(files)
+                manifest["chunk_count"] = sum(f.get("chunks", 0) for f in files.values())
+                return manifest
             except Exception as e:
                 logger.warning(f"Failed to load manifest: {e}")
 
         return {
             "version": "1.0",
+            "hash_algo": HASH_ALGO,
             "indexed_at": None,
             "file_count": 0,
             "chunk_count": 0,
@@ -209,13 +422,40 @@ class ProjectIndexer:
         }
 
     def _save_manifest(self):
-        """Save manifest to disk."""
+        """Save manifest to disk.
+
+        The manifest is machine-read, so it is written compact, and replaced
+        atomically so a crash mid-save leaves the previous one intact.
+        """
         try:
-            with open(self.manifest_path, "w") as f:
-                json.dump(self.manifest, f, indent=2)
+            tmp_path = self.manifest_path.with_suffix(".json.tmp")
+            tmp_path.write_bytes(_encode_json(self.manifest))
+            os.replace(tmp_path, self.manifest_path)
         except Exception as e:
             logger.error(f"Failed to save manifest: {e}")
 
+    def _record_files(self, entries: Dict[str, Dict[str, Any]]):
+        """Add or replace manifest file entries, keeping the totals current."""
+        files = self.manifest.setdefault("files", {})
+        chunk_count = self.manifest.get("chunk_count", 0)
+        for file_str, entry in entries.items():
+            previous = files.get(file_str)
+            if previous:
+                chunk_count -= previous.get("chunks", 0)
+            chunk_count += entry.get("chunks", 0)
+            files[file_str] = entry
+        self.manifest["chunk_count"] = chunk_count
+        self.manifest["file_count"] = len(files)
+
+    def _forget_file(self, file_str: str):
+        """Drop a file's manifest entry, keeping the totals current."""
+        entry = self.manifest.get("files", {}).pop(file_str, None)
+        if entry:
+            self.manifest["chunk_count"] = max(
+                self.manifest.get("chunk_count", 0) - entry.get("chunks", 0), 0
+            )
+        self.manifest["file_count"] = len(self.manifest.get("files", {}))
+
     def _load_config(self) -> Dict[str, Any]:
         """Load or create comprehensive configuration."""
         if self.config_path.exists():
@@ -374,106 +614,87 @@ class ProjectIndexer:
             logger.error(f"Failed to save config: {e}")
 
     def _get_file_hash(self, file_path: Path) -> str:
-        """Calculate SHA256 hash of a file."""
-        sha256_hash = hashlib.sha256()
+        """Calculate the HASH_ALGO digest of a file."""
         try:
             with open(file_path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
+                if xxhash is not None:
+                    digest = xxhash.xxh3_64()
+                    for byte_block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(byte_block)
+                    return digest.hexdigest()
+                if hasattr(hashlib, "file_digest"):  # Python 3.11+, hashes in C
+                    return hashlib.file_digest(f, "sha256").hexdigest()
+                sha256_hash = hashlib.sha256()
+                for byte_block in iter(lambda: f.read(1024 * 1024), b""):
                     sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
+                return sha256_hash.hexdigest()
         except Exception as e:
             logger.error(f"Failed to hash {file_path}: {e}")
             return ""
 
-    def _should_index_file(self, file_path: Path) -> bool:
+    def _get_file_hash_reused(self, file_path: Path, stat: os.stat_result) -> str:
+        """Hash a file, reusing the digest _needs_reindex took if it's unchanged since."""
+        key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+        file_hash = self._hash_cache.pop(key, None)
+        return file_hash if file_hash is not None else self._get_file_hash(file_path)
+
+    def _should_index_file(
+        self, file_path: Path, stat: Optional[os.stat_result] = None
+    ) -> bool:
         """Check if a file should be indexed based on patterns and content."""
         # Check file size (skip files > 1MB)
         try:
-            if file_path.stat().st_size > 1_000_000:
+            if (stat or file_path.stat()).st_size > 1_000_000:
                 return False
         except (OSError, IOError):
             return False
 
         # Check exclude patterns first
-        path_str = str(file_path)
-        for pattern in self.exclude_patterns:
-            if pattern in path_str:
-                return False
+        if _compile_exclude_patterns(tuple(self.exclude_patterns)).search(str(file_path)):
+            return False
 
-        # Check include patterns (extension-based)
-        for pattern in self.include_patterns:
+        # Check include patterns (extension-based). "*.ext" also matches a
+        # dotfile named exactly ".ext", whose suffix is empty. Like Path.match,
+        # the lookup ignores case for Windows paths only
+        fold_case = isinstance(file_path, PureWindowsPath)
+        suffixes, names, globs = _split_include_patterns(
+            tuple(self.include_patterns), fold_case
+        )
+        name, suffix = file_path.name, file_path.suffix
+        if fold_case:
+            name, suffix = name.lower(), suffix.lower()
+        if suffix in suffixes or name in suffixes or name in names:
+            return True
+        for pattern in globs:
             if file_path.match(pattern):
                 return True
 
         # NEW: Content-based inclusion for extensionless files
         if not file_path.suffix:
-            return self._should_index_extensionless_file(file_path)
+            return self._should_index_extensionless_file(file_path, stat)
 
         return False
 
-    def _should_index_extensionless_file(self, file_path: Path) -> bool:
+    def _should_index_extensionless_file(
+        self, file_path: Path, stat: Optional[os.stat_result] = None
+    ) -> bool:
         """Check if an extensionless file should be indexed based on content."""
         try:
-            # Read first 1KB to check content
-            with open(file_path, "rb") as f:
-                first_chunk = f.read(1024)
-
-            # Check if it's a text file (not binary)
-            try:
-                text_content = first_chunk.decode("utf-8")
-            except UnicodeDecodeError:
-                return False  # Binary file, skip
-
-            # Check for code indicators
-            code_indicators = [
-                "#!/usr/bin/env python",
-                "#!/usr/bin/python",
-                "#!.*python",
-                "import ",
-                "from ",
-                "def ",
-                "class ",
-                "if __name__",
-                "function ",
-                "var ",
-                "const ",
-                "let ",
-                "package main",
-                "public class",
-                "private class",
-                "public static void",
-            ]
-
-            text_lower = text_content.lower()
-            for indicator in code_indicators:
-                if indicator in text_lower:
-                    return True
-
-            # Check for configuration files
-            config_indicators = [
-                "#!/bin/bash",
-                "#!/bin/sh",
-                "[",
-                "version =",
-                "name =",
-                "description =",
-                "author =",
-                "<configuration>",
-                "<?xml",
-            ]
-
-            for indicator in config_indicators:
-                if indicator in text_lower:
-                    return True
-
+            stat = stat or file_path.stat()
+        except OSError:
             return False
+        return _sniff_extensionless_file(str(file_path), stat.st_size, stat.st_mtime_ns)
 
-        except Exception:
-            return False
+    def _relative_path(self, file_path: Path) -> str:
+        """Return a file's manifest key, reusing the one found by the walk."""
+        file_str = self._relative_paths.get(file_path)
+        if file_str is None:
+            file_str = normalize_relative_path(file_path, self.project_path)
+        return file_str
 
-    def _needs_reindex(self, file_path: Path) -> bool:
+    def _needs_reindex(self, file_path: Path, stat: Optional[os.stat_result] = None) -> bool:
         """Smart check if a file needs to be reindexed - optimized for speed."""
-        file_str = normalize_relative_path(file_path, self.project_path)
+        file_str = self._relative_path(file_path)
 
         # Not in manifest - needs indexing
         if file_str not in self.manifest["files"]:
@@ -482,7 +703,7 @@ class ProjectIndexer:
         file_info = self.manifest["files"][file_str]
 
         try:
-            stat = file_path.stat()
+            stat = stat or file_path.stat()
 
             # Quick checks first (no I/O) - check size and modification time
             stored_size = file_info.get("size", 0)
@@ -498,9 +719,19 @@ class ProjectIndexer:
             # Size and mtime same - check hash only if needed (for paranoia)
             # This catches cases where content changed but mtime didn't (rare but possible)
             current_hash = self._get_file_hash(file_path)
+            if self.manifest.get("hash_algo", "sha256") != HASH_ALGO:
+                # Stored digests use another algorithm and can't be compared;
+                # trust size and mtime and switch the entry over
+                file_info["hash"] = current_hash
+                return False
             stored_hash = file_info.get("hash", "")
 
-            return current_hash != stored_hash
+            if current_hash != stored_hash:
+                # Processing the file will need this digest again
+                key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+                self._hash_cache[key] = current_hash
+                return True
+            return False
 
         except (OSError, IOError) as e:
             logger.warning(f"Could not check file stats for {file_path}: {e}")
@@ -521,17 +752,25 @@ class ProjectIndexer:
         if removed_files:
             logger.info(f"Cleaning up {len(removed_files)} removed files from index")
 
-            for file_str in removed_files:
-                # Remove from database
-                try:
-                    if hasattr(self, "table") and self.table:
-                        self.table.delete(f"file_path = '{file_str}'")
-                        logger.debug(f"Removed chunks for deleted file: {file_str}")
-                except Exception as e:
-                    logger.warning(f"Could not remove chunks for {file_str}: {e}")
+            # Remove from database with one delete (one table commit) per batch
+            if getattr(self, "table", None) is not None:
+                for start in range(0, len(removed_files), DELETE_BATCH_FILES):
+                    batch = removed_files[start : start + DELETE_BATCH_FILES]
+                    quoted = ", ".join("'" + f.replace("'", "''") + "'" for f in batch)
+                    try:
+                        self.table.delete(f"file_path IN ({quoted})")
+                        logger.debug(f"Removed chunks for {len(batch)} deleted files")
+                    except Exception as e:
+                        logger.warning(f"Could not remove chunks for {len(batch)} files: {e}")
+                if len(removed_files) > DELETE_BATCH_FILES:
+                    try:
+                        self.table.optimize()
+                    except Exception as e:
+                        logger.warning(f"Could not compact index table: {e}")
 
-                # Remove from manifest
-                del self.manifest["files"][file_str]
+            # Remove from manifest
+            for file_str in removed_files:
+                self._forget_file(file_str)
 
             # Save updated manifest
             self._save_manifest()
@@ -541,23 +780,58 @@ class ProjectIndexer:
         """Get all files that need to be indexed."""
         files_to_index = []
 
-        # Walk through project directory
-        for root, dirs, files in os.walk(self.project_path):
-            # Skip excluded directories
-            dirs[:] = [
-                d for d in dirs if not any(pattern in d for pattern in self.exclude_patterns)
-            ]
-
-            root_path = Path(root)
-            for file in files:
-                file_path = root_path / file
+        # Snapshot what the manifest knows, so most files are settled by one
+        # dict lookup and a size/mtime comparison
+        known = {
+            file_str: (info.get("size", 0), info.get("mtime", 0))
+            for file_str, info in self.manifest["files"].items()
+        }
 
-                if self._should_index_file(file_path) and self._needs_reindex(file_path):
-                    files_to_index.append(file_path)
+        # Walk the project with scandir so each file is stat'ed once and the
+        # result shared by the size check and the change check
+        excluded = _compile_exclude_patterns(tuple(self.exclude_patterns))
+        root = str(self.project_path)
+        self._relative_paths = {}
+        dirs = [root]
+        while dirs:
+            try:
+                with os.scandir(dirs.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skip excluded directories
+                            if not excluded.search(entry.name):
+                                dirs.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+
+                        file_path = Path(entry.path)
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        if not self._should_index_file(file_path, stat):
+                            continue
+
+                        # Symlinked dirs aren't walked, so only a symlinked
+                        # file needs resolving to match its manifest key
+                        if entry.is_symlink():
+                            file_str = normalize_relative_path(file_path, root)
+                        else:
+                            file_str = entry.path[len(root) + 1 :].replace(os.sep, "/")
+                        self._relative_paths[file_path] = file_str
+                        seen = known.get(file_str)
+                        if seen is None or seen != (stat.st_size, stat.st_mtime):
+                            files_to_index.append(file_path)
+                        elif self._needs_reindex(file_path, stat):
+                            # Unchanged size and mtime: compare content hashes
+                            files_to_index.append(file_path)
+            except OSError as e:
+                logger.debug(f"Skipping unreadable directory: {e}")
 
         return files_to_index
 
-    def _process_image_file(self, file_path: Path) -> Optional[List[Dict[str, Any]]]:
+    def _process_image_file(self, file_path: Path) -> Optional[RecordColumns]:
         """Process an image file for multimodal indexing.
 
         Creates a single record per image with:
@@ -582,48 +856,45 @@ class ProjectIndexer:
                 return None
 
             # Create text content for BM25 (searchable by filename and path)
-            rel_path = normalize_relative_path(file_path, self.project_path)
+            rel_path = self._relative_path(file_path)
             parent = file_path.parent.name
             content = f"[Image: {file_path.name}] {parent}/{file_path.name} ({size_kb:.0f}KB)"
 
-            record = {
-                "file_path": rel_path,
-                "absolute_path": normalize_path(file_path),
-                "chunk_id": f"{file_path.stem}_img_0",
-                "content": content,
-                "start_line": 0,
-                "end_line": 0,
-                "chunk_type": "image",
-                "name": file_path.name,
-                "language": "image",
-                "embedding": embedding,
-                "indexed_at": datetime.now().isoformat(),
-                "file_lines": 0,
-                "chunk_index": 0,
-                "total_chunks": 1,
-                "parent_class": "",
-                "parent_function": "",
-                "prev_chunk_id": "",
-                "next_chunk_id": "",
-            }
+            records = RecordColumns()
+            for name, value in (
+                ("file_path", rel_path),
+                ("absolute_path", normalize_path(file_path)),
+                ("chunk_id", f"{file_path.stem}_img_0"),
+                ("content", content),
+                ("start_line", 0),
+                ("end_line", 0),
+                ("chunk_type", "image"),
+                ("name", file_path.name),
+                ("language", "image"),
+                ("indexed_at", datetime.now().isoformat()),
+                ("file_lines", 0),
+                ("chunk_index", 0),
+                ("total_chunks", 1),
+                ("parent_class", ""),
+                ("parent_function", ""),
+                ("prev_chunk_id", ""),
+                ("next_chunk_id", ""),
+            ):
+                records.columns[name].append(value)
+            records.embeddings.append(embedding.astype(np.float32, copy=False).reshape(1, -1))
 
-            return [record]
+            return records
 
         except Exception as e:
             logger.error(f"Failed to process image {file_path}: {e}")
             return None
 
-    def _process_file(
-        self, file_path: Path, stream_threshold: int = 1024 * 1024
-    ) -> Optional[List[Dict[str, Any]]]:
+    def _process_file(self, file_path: Path) -> Optional[RecordColumns]:
         """Process a single file: read, chunk, embed.
 
         Args:
             file_path: Path to the file to process
-            stream_threshold: Files larger than this (in bytes) use streaming (default: 1MB)
         """
-        IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
-
         try:
             # Route image files to multimodal processing
             if file_path.suffix.lower() in IMAGE_EXTENSIONS:
@@ -633,133 +904,161 @@ class ProjectIndexer:
                     logger.debug(f"Skipping image (model doesn't support multimodal): {file_path}")
                     return None
 
-            # Check file size for streaming decision
-            file_size = file_path.stat().st_size
-
-            if file_size > stream_threshold:
-                logger.info(f"Streaming large file ({file_size:,} bytes): {file_path}")
-                content = self._read_file_streaming(file_path)
-            else:
-                # Read file content normally for small files
-                content = file_path.read_text(encoding="utf-8")
-
-            # Chunk the file
-            chunks = self.chunker.chunk_file(file_path, content)
-
+            chunks = self._read_and_chunk(file_path)
             if not chunks:
                 return None
 
-            # Prepare data for embedding
-            chunk_texts = [chunk.content for chunk in chunks]
-
             # Generate embeddings
-            embeddings = self.embedder.embed_code(chunk_texts)
+            embeddings = self.embedder.embed_code([chunk.content for chunk in chunks])
 
-            # Prepare records for database
-            records = []
-            expected_dim = self.embedder.get_embedding_dim()
-
-            for i, chunk in enumerate(chunks):
-                # Validate embedding
-                embedding = embeddings[i].astype(np.float32)
-                if embedding.shape != (expected_dim,):
-                    raise ValueError(
-                        f"Invalid embedding dimension for {file_path} chunk {i}: "
-                        f"expected ({expected_dim},), got {embedding.shape}"
-                    )
-
-                record = {
-                    "file_path": normalize_relative_path(file_path, self.project_path),
-                    "absolute_path": normalize_path(file_path),
-                    "chunk_id": f"{file_path.stem}_{i}",
-                    "content": chunk.content,
-                    "start_line": int(chunk.start_line),
-                    "end_line": int(chunk.end_line),
-                    "chunk_type": chunk.chunk_type,
-                    "name": chunk.name or f"chunk_{i}",
-                    "language": chunk.language,
-                    "embedding": embedding,  # Keep as numpy array
-                    "indexed_at": datetime.now().isoformat(),
-                    # Add new metadata fields
-                    "file_lines": int(chunk.file_lines) if chunk.file_lines else 0,
-                    "chunk_index": (
-                        int(chunk.chunk_index) if chunk.chunk_index is not None else i
-                    ),
-                    "total_chunks": (
-                        int(chunk.total_chunks) if chunk.total_chunks else len(chunks)
-                    ),
-                    "parent_class": chunk.parent_class or "",
-                    "parent_function": chunk.parent_function or "",
-                    "prev_chunk_id": chunk.prev_chunk_id or "",
-                    "next_chunk_id": chunk.next_chunk_id or "",
-                }
-                records.append(record)
-
-            # Update manifest with enhanced tracking
-            file_str = normalize_relative_path(file_path, self.project_path)
-            stat = file_path.stat()
-            self.manifest["files"][file_str] = {
-                "hash": self._get_file_hash(file_path),
-                "size": stat.st_size,
-                "mtime": stat.st_mtime,
-                "chunks": len(chunks),
-                "indexed_at": datetime.now().isoformat(),
-                "language": chunks[0].language if chunks else "unknown",
-                "encoding": "utf-8",  # Track encoding used
-            }
-
-            return records
+            return self._build_records(file_path, chunks, embeddings)
 
         except Exception as e:
             logger.error(f"Failed to process {file_path}: {e}")
             return None
 
-    def _read_file_streaming(self, file_path: Path, chunk_size: int = 64 * 1024) -> str:
+    def _read_and_chunk(self, file_path: Path) -> list:
+        """Read a text file and split it into chunks, without embedding them."""
+        return self.chunker.chunk_file(file_path, self._read_text(file_path))
+
+    def _build_records(
+        self,
+        file_path: Path,
+        chunks: list,
+        embeddings: np.ndarray,
+        expected_dim: Optional[int] = None,
+        indexed_at: Optional[str] = None,
+    ) -> RecordColumns:
+        """Build database records for a file's embedded chunks and its manifest entry.
+
+        ``expected_dim`` and ``indexed_at`` let a caller building several files
+        at once look them up a single time.
         """
-        Read large files in chunks to avoid loading entirely into memory.
+        # Validate embeddings once for the whole file
+        if expected_dim is None:
+            expected_dim = self.embedder.get_embedding_dim()
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape != (len(chunks), expected_dim):
+            raise ValueError(
+                f"Invalid embedding dimensions for {file_path}: "
+                f"expected ({len(chunks)}, {expected_dim}), got {embeddings.shape}"
+            )
+
+        records = RecordColumns()
+        records.embeddings.append(embeddings)
+        columns = records.columns
+        count = len(chunks)
+
+        # Per-file values are repeated rather than recomputed per chunk
+        file_str = self._relative_path(file_path)
+        columns["file_path"] = [file_str] * count
+        columns["absolute_path"] = [normalize_path(file_path)] * count
+        indexed_at = indexed_at or datetime.now().isoformat()
+        columns["indexed_at"] = [indexed_at] * count
+
+        # One comprehension per column; each is a tight loop with no
+        # per-chunk column lookups
+        stem = file_path.stem
+        columns["chunk_id"] = [f"{stem}_{i}" for i in range(count)]
+        columns["content"] = [chunk.content for chunk in chunks]
+        columns["start_line"] = [int(chunk.start_line) for chunk in chunks]
+        columns["end_line"] = [int(chunk.end_line) for chunk in chunks]
+        columns["chunk_type"] = [chunk.chunk_type for chunk in chunks]
+        columns["name"] = [chunk.name or f"chunk_{i}" for i, chunk in enumerate(chunks)]
+        columns["language"] = [chunk.language for chunk in chunks]
+        columns["file_lines"] = [
+            int(chunk.file_lines) if chunk.file_lines else 0 for chunk in chunks
+        ]
+        columns["chunk_index"] = [
+            int(chunk.chunk_index) if chunk.chunk_index is not None else i
+            for i, chunk in enumerate(chunks)
+        ]
+        columns["total_chunks"] = [
+            int(chunk.total_chunks) if chunk.total_chunks else count for chunk in chunks
+        ]
+        columns["parent_class"] = [chunk.parent_class or "" for chunk in chunks]
+        columns["parent_function"] = [chunk.parent_function or "" for chunk in chunks]
+        columns["prev_chunk_id"] = [chunk.prev_chunk_id or "" for chunk in chunks]
+        columns["next_chunk_id"] = [chunk.next_chunk_id or "" for chunk in chunks]
+
+        # Manifest entry with enhanced tracking, recorded once the rows are written
+        stat = file_path.stat()
+        records.files[file_str] = {
+            "hash": self._get_file_hash_reused(file_path, stat),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "chunks": len(chunks),
+            "indexed_at": indexed_at,
+            "language": chunks[0].language if chunks else "unknown",
+            "encoding": "utf-8",  # Track encoding used
+        }
+
+        return records
+
+    def _embed_file_batch(self, batch: list) -> tuple:
+        """Embed the chunks of several files in one call and build their records.
 
         Args:
-            file_path: Path to the file to read
-            chunk_size: Size of each read chunk in bytes (default: 64KB)
+            batch: (file_path, chunks) pairs
 
         Returns:
-            Complete file content as string
+            (records, failed_files)
         """
-        content_parts = []
-
+        texts = [chunk.content for _, chunks in batch for chunk in chunks]
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    content_parts.append(chunk)
+            embeddings = self.embedder.embed_code(texts)
+        except Exception as e:
+            logger.error(f"Failed to embed {len(texts)} chunks: {e}")
+            return RecordColumns(), [file_path for file_path, _ in batch]
 
-            logger.debug(f"Streamed {len(content_parts)} chunks from {file_path}")
-            return "".join(content_parts)
+        # Looked up once per batch; the embedder may still update it while
+        # detecting its provider, so it isn't cached on the indexer
+        expected_dim = self.embedder.get_embedding_dim()
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        indexed_at = datetime.now().isoformat()
 
-        except UnicodeDecodeError:
-            # Try with different encodings for problematic files
-            for encoding in ["latin-1", "cp1252", "utf-8-sig"]:
-                try:
-                    with open(file_path, "r", encoding=encoding) as f:
-                        content_parts = []
-                        while True:
-                            chunk = f.read(chunk_size)
-                            if not chunk:
-                                break
-                            content_parts.append(chunk)
-
-                    logger.debug(
-                        f"Streamed {len(content_parts)} chunks from {file_path} using {encoding}"
+        records = RecordColumns()
+        failed_files = []
+        offset = 0
+        for file_path, chunks in batch:
+            try:
+                file_embeddings = embeddings[offset : offset + len(chunks)]
+                records.extend(
+                    self._build_records(
+                        file_path, chunks, file_embeddings, expected_dim, indexed_at
                     )
-                    return "".join(content_parts)
-                except UnicodeDecodeError:
-                    continue
+                )
+            except Exception as e:
+                logger.error(f"Failed to process {file_path}: {e}")
+                failed_files.append(file_path)
+            offset += len(chunks)
+        return records, failed_files
 
-            # If all encodings fail, return empty string
-            logger.warning(f"Could not decode {file_path} with any encoding")
-            return ""
+    def _read_text(self, file_path: Path) -> str:
+        """
+        Read a file in one call and decode it, trying fallback encodings.
+
+        Indexed files are capped well below sizes where reading them whole
+        is a concern, and one read avoids joining many partial strings.
+
+        Args:
+            file_path: Path to the file to read
+
+        Returns:
+            File content as string, or "" if no encoding fits
+        """
+        data = file_path.read_bytes()
+        for encoding in ("utf-8", "latin-1", "cp1252", "utf-8-sig"):
+            try:
+                content = data.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+            if encoding != "utf-8":
+                logger.debug(f"Decoded {file_path} using {encoding}")
+            return content
+
+        logger.warning(f"Could not decode {file_path} with any encoding")
+        return ""
 
     def _init_database(self):
         """Initialize LanceDB connection and table."""
@@ -864,6 +1163,55 @@ class ProjectIndexer:
             logger.error(f"Failed to initialize database: {e}")
             raise
 
+    def _records_to_arrow(self, records: RecordColumns) -> "pa.Table":
+        """Build an Arrow table in the code_vectors schema from record columns.
+
+        Embeddings are wrapped as the fixed-size list column straight from
+        one float32 buffer, rather than boxed per row as pandas would.
+        """
+        schema = self.table.schema
+        arrays = []
+        for field in schema:
+            if field.name == "embedding":
+                matrix = records.embedding_matrix()
+                arrays.append(
+                    pa.FixedSizeListArray.from_arrays(
+                        pa.array(matrix.reshape(-1), type=pa.float32()), matrix.shape[1]
+                    )
+                )
+            elif field.name in records.columns:
+                arrays.append(pa.array(records.columns[field.name], type=field.type))
+            else:
+                arrays.append(pa.nulls(len(records), type=field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _build_vector_index(self):
+        """Build (or rebuild) the IVF_PQ index on the embedding column.
+
+        Search uses the default L2 distance, so the index does too. Later
+        incremental writes are folded in by table.optimize().
+        """
+        try:
+            rows = self.table.count_rows()
+            if rows < VECTOR_INDEX_MIN_ROWS:
+                return
+            dim = self.table.schema.field("embedding").type.list_size
+            # PQ needs sub-vectors that divide the dimension evenly
+            num_sub_vectors = max(1, min(96, dim // 16))
+            while dim % num_sub_vectors:
+                num_sub_vectors -= 1
+            self.table.create_index(
+                metric="l2",
+                vector_column_name="embedding",
+                # sqrt(rows) partitions, capped so each has enough rows to train
+                num_partitions=max(1, min(int(math.sqrt(rows)), rows // 256)),
+                num_sub_vectors=num_sub_vectors,
+                replace=True,
+            )
+            logger.info(f"Built vector index over {rows} chunks")
+        except Exception as e:
+            logger.warning(f"Could not build vector index: {e}")
+
     def cancel_indexing(self):
         """Request cancellation of the current indexing operation.
 
@@ -910,6 +1258,7 @@ class ProjectIndexer:
         if force_reindex:
             self.manifest = {
                 "version": "1.0",
+                "hash_algo": HASH_ALGO,
                 "indexed_at": None,
                 "file_count": 0,
                 "chunk_count": 0,
@@ -927,6 +1276,10 @@ class ProjectIndexer:
         files_to_index = self._get_files_to_index()
 
         if not files_to_index:
+            if self.manifest.get("hash_algo", "sha256") != HASH_ALGO:
+                # The up-to-date check rewrote every digest; keep them
+                self.manifest["hash_algo"] = HASH_ALGO
+                self._save_manifest()
             console.print("[green][/green] All files are up to date!")
             return {
                 "files_indexed": 0,
@@ -937,9 +1290,31 @@ class ProjectIndexer:
         console.print(f"[cyan]Found {len(files_to_index)} files to index[/cyan]")
 
         # Process files in parallel
-        all_records = []
+        all_records = RecordColumns()  # Not yet written to the table
+        chunks_written = 0
+        flushes = 0
         failed_files = []
 
+        def flush(min_records=1):
+            nonlocal all_records, chunks_written, flushes
+            if len(all_records) < min_records:
+                return
+            try:
+                # Table should already be created in _init_database
+                if self.table is None:
+                    raise RuntimeError("Table not initialized properly")
+                self.table.add(self._records_to_arrow(all_records))
+            except Exception as e:
+                logger.error(f"Failed to insert records: {e}")
+                raise
+            # The manifest only ever lists files whose rows are stored, so an
+            # interrupted run resumes from the last write
+            self._record_files(all_records.files)
+            self._save_manifest()
+            chunks_written += len(all_records)
+            flushes += 1
+            all_records = RecordColumns()
+
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -951,12 +1326,32 @@ class ProjectIndexer:
 
             task = progress.add_task("[cyan]Indexing files...", total=len(files_to_index))
 
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Submit all files for processing
+            # Readers chunk files while a separate pool embeds finished
+            # batches, so disk, chunking and embedding requests overlap
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor, ThreadPoolExecutor(
+                max_workers=self.embed_workers, thread_name_prefix="embed"
+            ) as embed_pool:
+                # Images are embedded whole by the reader workers
                 future_to_file = {
-                    executor.submit(self._process_file, file_path): file_path
+                    executor.submit(
+                        self._process_file
+                        if file_path.suffix.lower() in IMAGE_EXTENSIONS
+                        else self._read_and_chunk,
+                        file_path,
+                    ): file_path
                     for file_path in files_to_index
                 }
+                pending = []  # (file_path, chunks) awaiting embedding
+                pending_chunks = 0
+                embedding = set()  # Batches submitted to embed_pool
+
+                def collect(futures):
+                    for f in futures:
+                        if not f.cancelled():
+                            records, failed = f.result()
+                            all_records.extend(records)
+                            failed_files.extend(failed)
+                    embedding.difference_update(futures)
 
                 # Process completed files with cancel support
                 files_done = 0
@@ -966,19 +1361,35 @@ class ProjectIndexer:
                         # Cancel remaining futures
                         for f in future_to_file:
                             f.cancel()
+                        for f in embedding:
+                            f.cancel()
                         logger.info("Indexing cancelled by user")
                         break
 
                     file_path = future_to_file[future]
 
                     try:
-                        records = future.result()
-                        if records:
-                            all_records.extend(records)
+                        result = future.result()
                     except Exception as e:
                         logger.error(f"Failed to process {file_path}: {e}")
                         failed_files.append(file_path)
-
+                        result = None
+
+                    if file_path.suffix.lower() in IMAGE_EXTENSIONS:
+                        if result:
+                            all_records.extend(result)
+                    elif result:
+                        pending.append((file_path, result))
+                        pending_chunks += len(result)
+                        if pending_chunks >= EMBED_BATCH_CHUNKS:
+                            # Backpressure: don't queue batches faster than they embed
+                            if len(embedding) >= 2 * self.embed_workers:
+                                collect(wait(embedding, return_when=FIRST_COMPLETED).done)
+                            embedding.add(embed_pool.submit(self._embed_file_batch, pending))
+                            pending, pending_chunks = [], 0
+
+                    collect({f for f in embedding if f.done()})
+                    flush(FLUSH_RECORDS)
                     files_done += 1
                     progress.advance(task)
 
@@ -986,39 +1397,33 @@ class ProjectIndexer:
                     if self._progress_callback:
                         try:
                             self._progress_callback(
-                                files_done, len(files_to_index), len(all_records)
+                                files_done,
+                                len(files_to_index),
+                                chunks_written + len(all_records),
                             )
                         except Exception:
                             pass  # Don't let callback errors break indexing
 
-        # Batch insert all records
-        if all_records:
-            try:
-                df = pd.DataFrame(all_records)
-                # Ensure correct data types
-                df["start_line"] = df["start_line"].astype("int32")
-                df["end_line"] = df["end_line"].astype("int32")
-                df["file_lines"] = df["file_lines"].astype("int32")
-                df["chunk_index"] = df["chunk_index"].astype("int32")
-                df["total_chunks"] = df["total_chunks"].astype("int32")
-
-                # Table should already be created in _init_database
-                if self.table is None:
-                    raise RuntimeError("Table not initialized properly")
+                if pending and not self._cancel_event.is_set():
+                    embedding.add(embed_pool.submit(self._embed_file_batch, pending))
+                collect(set(embedding))
 
-                self.table.add(df)
-
-                console.print(f"[green][/green] Added {len(all_records)} chunks to database")
+        # Write whatever is left after the last full batch
+        flush()
+        if chunks_written:
+            console.print(f"[green][/green] Added {chunks_written} chunks to database")
+        if flushes > 1:
+            # Merge the small fragments left by incremental writes
+            try:
+                self.table.optimize()
             except Exception as e:
-                logger.error(f"Failed to insert records: {e}")
-                raise
+                logger.warning(f"Could not compact index table: {e}")
+        if chunks_written and (force_reindex or chunks_written >= VECTOR_INDEX_MIN_ROWS):
+            self._build_vector_index()
 
         # Update manifest with embedding info (so searcher can verify match)
         self.manifest["indexed_at"] = datetime.now().isoformat()
-        self.manifest["file_count"] = len(self.manifest["files"])
-        self.manifest["chunk_count"] = sum(
-            f["chunks"] for f in self.manifest["files"].values()
-        )
+        self.manifest["hash_algo"] = HASH_ALGO
         self.manifest["embedding"] = {
             "model": self.embedder.model_name,
             "dim": self.embedder.embedding_dim,
@@ -1036,7 +1441,7 @@ class ProjectIndexer:
             "files_indexed": files_done if 'files_done' in dir() else len(files_to_index) - len(failed_files),
             "files_total": len(files_to_index),
             "files_failed": len(failed_files),
-            "chunks_created": len(all_records),
+            "chunks_created": chunks_written,
             "time_taken": time_taken,
             "files_per_second": (len(files_to_index) / time_taken if time_taken > 0 else 0),
             "cancelled": was_cancelled,
@@ -1078,13 +1483,7 @@ class ProjectIndexer:
             records = self._process_file(file_path)
 
             if records:
-                # Create DataFrame with proper types
-                df = pd.DataFrame(records)
-                df["start_line"] = df["start_line"].astype("int32")
-                df["end_line"] = df["end_line"].astype("int32")
-                df["file_lines"] = df["file_lines"].astype("int32")
-                df["chunk_index"] = df["chunk_index"].astype("int32")
-                df["total_chunks"] = df["total_chunks"].astype("int32")
+                df = self._records_to_arrow(records)
 
                 # Use vector store's update method (multiply out old, multiply in new)
                 if hasattr(self, "_vector_store") and self._vector_store:
@@ -1104,19 +1503,21 @@ class ProjectIndexer:
                     # Update manifest with enhanced file tracking
                     file_hash = self._get_file_hash(file_path)
                     stat = file_path.stat()
-                    if "files" not in self.manifest:
-                        self.manifest["files"] = {}
-                    self.manifest["files"][file_str] = {
-                        "hash": file_hash,
-                        "size": stat.st_size,
-                        "mtime": stat.st_mtime,
-                        "chunks": len(records),
-                        "last_updated": datetime.now().isoformat(),
-                        "language": (
-                            records[0].get("language", "unknown") if records else "unknown"
-                        ),
-                        "encoding": "utf-8",
-                    }
+                    self._record_files(
+                        {
+                            file_str: {
+                                "hash": file_hash,
+                                "size": stat.st_size,
+                                "mtime": stat.st_mtime,
+                                "chunks": len(records),
+                                "last_updated": datetime.now().isoformat(),
+                                "language": (
+                                    records.columns["language"][0] if records else "unknown"
+                                ),
+                                "encoding": "utf-8",
+                            }
+                        }
+                    )
                     self._save_manifest()
                     logger.debug(f"Successfully updated {len(records)} chunks for {file_str}")
                     return True
@@ -1166,8 +1567,8 @@ class ProjectIndexer:
                     success = False
 
             # Update manifest
-            if success and "files" in self.manifest and file_str in self.manifest["files"]:
-                del self.manifest["files"][file_str]
+            if success and file_str in self.manifest.get("files", {}):
+                self._forget_file(file_str)
                 self._save_manifest()
                 logger.debug(f"Deleted chunks for file: {file_str}")
 
@@ -15,6 +15,13 @@ from typing import Any, List, Optional
 
 import requests
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 try:
     from .llm_safeguards import (
         ModelRunawayDetector,
@@ -36,6 +43,10 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# How long Ollama keeps a model loaded after a generate call. Longer than its
+# 5 minute default so a pause between questions doesn't force a reload
+OLLAMA_KEEP_ALIVE = "30m"
+
 
 @dataclass
 class SynthesisResult:
@@ -64,6 +75,7 @@ class LLMSynthesizer:
         config=None,
         provider: str = "auto",
         api_key: str = None,
+        session: Optional[requests.Session] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.ollama_url = ollama_url.rstrip("/")
@@ -76,6 +88,8 @@ class LLMSynthesizer:
         self.api_key = api_key
         self._active_provider = None  # Set during init: "openai" or "ollama"
         self._last_usage = {}  # Token usage from last API call
+        # HTTP client: a caller's pooled Session keeps connections alive between calls
+        self._http = session or requests
 
         # Initialize safeguards
         if ModelRunawayDetector:
@@ -100,7 +114,7 @@ class LLMSynthesizer:
                 headers = {}
                 if self.api_key:
                     headers["Authorization"] = f"Bearer {self.api_key}"
-                response = requests.get(
+                response = self._http.get(
                     f"{self.base_url}/models", headers=headers, timeout=5
                 )
                 if response.status_code == 200:
@@ -117,7 +131,7 @@ class LLMSynthesizer:
         # Fall back to Ollama
         if self.provider != "openai":
             try:
-                response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+                response = self._http.get(f"{self.ollama_url}/api/tags", timeout=5)
                 if response.status_code == 200:
                     data = response.json()
                     models = [model["name"] for model in data.get("models", [])]
@@ -148,7 +162,7 @@ class LLMSynthesizer:
         }
 
         try:
-            response = requests.post(  # nosec B113 - timeout is set below
+            response = self._http.post(  # nosec B113 - timeout is set below
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=payload,
@@ -188,7 +202,7 @@ class LLMSynthesizer:
         }
 
         try:
-            response = requests.post(
+            response = self._http.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=payload,
@@ -208,7 +222,7 @@ class LLMSynthesizer:
                 if data_str.strip() == "[DONE]":
                     break
                 try:
-                    chunk = json.loads(data_str)
+                    chunk = _json_loads(data_str)
                     # Check for usage in final chunk
                     usage = chunk.get("usage")
                     if usage:
@@ -560,6 +574,7 @@ class LLMSynthesizer:
                 "model": model_to_use,
                 "prompt": final_prompt,
                 "stream": use_streaming,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
                 "options": {
                     "temperature": qwen3_temp,
                     "top_p": qwen3_top_p,
@@ -579,7 +594,7 @@ class LLMSynthesizer:
                     payload, model_to_use, use_thinking, start_time, collapse_thinking
                 )
 
-            response = requests.post(
+            response = self._http.post(
                 f"{self.ollama_url}/api/generate",
                 json=payload,
                 timeout=65,  # Slightly longer than safeguard timeout
@@ -719,7 +734,7 @@ This is normal with smaller AI models and helps ensure you get quality responses
         import json
 
         try:
-            response = requests.post(
+            response = self._http.post(
                 f"{self.ollama_url}/api/generate", json=payload, stream=True, timeout=65
             )
 
@@ -745,7 +760,7 @@ This is normal with smaller AI models and helps ensure you get quality responses
             for line in response.iter_lines():
                 if line:
                     try:
-                        chunk_data = json.loads(line.decode("utf-8"))
+                        chunk_data = _json_loads(line)
                         chunk_text = chunk_data.get("response", "")
 
                         if chunk_text:
@@ -870,7 +885,7 @@ This is normal with smaller AI models and helps ensure you get quality responses
         import json
 
         try:
-            response = requests.post(
+            response = self._http.post(
                 f"{self.ollama_url}/api/generate", json=payload, stream=True, timeout=65
             )
 
@@ -889,7 +904,7 @@ This is normal with smaller AI models and helps ensure you get quality responses
             for line in response.iter_lines():
                 if line:
                     try:
-                        chunk_data = json.loads(line.decode("utf-8"))
+                        chunk_data = _json_loads(line)
                         chunk_text = chunk_data.get("response", "")
 
                         if chunk_text:
@@ -927,7 +942,7 @@ This is normal with smaller AI models and helps ensure you get quality responses
                                             "model": model_name,
                                             "stop": True,
                                         }
-                                        requests.post(
+                                        self._http.post(
                                             f"{self.ollama_url}/api/generate",
                                             json=stop_payload,
                                             timeout=2,
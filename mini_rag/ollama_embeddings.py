@@ -391,6 +391,53 @@ class OllamaEmbedder:
                 "sentence-transformers for local ML embeddings."
             )
 
+    # Texts sent per request when a provider accepts a list of inputs
+    MAX_BATCH_TEXTS = 64
+
+    def _get_embeddings_batched(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed several texts in one request per batch, if the provider allows.
+
+        OpenAI-compatible endpoints take a list ``input`` and the local
+        sentence-transformers model encodes a list in one pass. Returns a
+        (len(texts), dim) float32 array, or None for providers that only
+        embed one text at a time.
+        """
+        texts = [text[: self.MAX_EMBED_CHARS] for text in texts]
+
+        if self.mode == "openai" and self.base_url.rstrip("/").endswith("/v1"):
+            parts = [
+                self._get_openai_embeddings(texts[start : start + self.MAX_BATCH_TEXTS])
+                for start in range(0, len(texts), self.MAX_BATCH_TEXTS)
+            ]
+            return parts[0] if len(parts) == 1 else np.concatenate(parts)
+        if (
+            self.mode == "fallback"
+            and self.fallback_embedder
+            and self.fallback_embedder.model_type == "sentence_transformer"
+        ):
+            encoded = self.fallback_embedder.encode(texts, convert_to_numpy=True)
+            return encoded.astype(np.float32, copy=False)
+        return None
+
+    def _get_openai_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Embed a list of texts with one OpenAI-format request, one row per text."""
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        response = requests.post(
+            f"{self.base_url}/embeddings",
+            headers=headers,
+            json={"model": self.model_name, "input": texts},
+            timeout=30 + len(texts),
+        )
+        response.raise_for_status()
+
+        data = sorted(response.json()["data"], key=lambda item: item.get("index", 0))
+        if len(data) != len(texts):
+            raise RuntimeError(f"Expected {len(texts)} embeddings, got {len(data)}")
+        return np.array([item["embedding"] for item in data], dtype=np.float32)
+
     def _get_openai_embedding(self, text: str) -> np.ndarray:
         """Get embedding from OpenAI-compatible or custom endpoint.
 
@@ -570,17 +617,26 @@ class OllamaEmbedder:
         # Preprocess code for better embeddings
         processed_code = [self._preprocess_code(c, language) for c in code]
 
-        # Generate embeddings (with per-chunk error recovery)
-        embeddings = []
-        for text in processed_code:
-            try:
-                embedding = self._get_embedding(text)
-            except (RuntimeError, Exception) as e:
-                logger.warning(f"Embedding failed for chunk ({len(text)} chars), using zero vector: {e}")
-                embedding = np.zeros(self.embedding_dim, dtype=np.float32)
-            embeddings.append(embedding)
-
-        embeddings = np.array(embeddings, dtype=np.float32)
+        # Generate embeddings in batches where possible, otherwise (or if a
+        # batch fails) one at a time with per-chunk error recovery
+        try:
+            embeddings = self._get_embeddings_batched(processed_code)
+        except Exception as e:
+            logger.debug(f"Batch embedding failed, embedding chunks one by one: {e}")
+            embeddings = None
+
+        if embeddings is None:
+            embeddings = []
+            for text in processed_code:
+                try:
+                    embedding = self._get_embedding(text)
+                except (RuntimeError, Exception) as e:
+                    logger.warning(f"Embedding failed for chunk ({len(text)} chars), using zero vector: {e}")
+                    embedding = np.zeros(self.embedding_dim, dtype=np.float32)
+                embeddings.append(embedding)
+
+        # Batched results are already a float32 matrix and are not copied
+        embeddings = np.asarray(embeddings, dtype=np.float32)
 
         if single_input:
             return embeddings[0]
@@ -622,6 +678,10 @@ class OllamaEmbedder:
         enhanced_query = f"Search for code related to: {query}"
         return self._get_embedding(enhanced_query)
 
+    def embed_text(self, text: str) -> np.ndarray:
+        """Embed text as is, without the search-query or code framing."""
+        return self._get_embedding(text)
+
     def batch_embed_files(self, file_contents: List[dict], max_workers: int = 4) -> List[dict]:
         """
         Embed multiple files efficiently using concurrent requests to Ollama.
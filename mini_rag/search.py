@@ -27,6 +27,12 @@ from rich.table import Table
 # CamelCase boundary pattern: split "getAuthManager" -> ["get", "auth", "manager"]
 _CAMEL_SPLIT = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
 
+# Large indexes carry an IVF_PQ vector index. Probe enough partitions for
+# good recall, and re-rank refine_factor x limit candidates by exact distance
+# so the returned _distance (and the scores built from it) aren't PQ estimates
+VECTOR_SEARCH_NPROBES = 20
+VECTOR_SEARCH_REFINE_FACTOR = 10
+
 
 def _tokenize_for_bm25(text: str) -> List[str]:
     """Tokenize text for BM25 with code-aware splitting.
@@ -146,13 +152,19 @@ class SearchResult:
 class CodeSearcher:
     """Semantic code search using vector similarity."""
 
-    def __init__(self, project_path: Path, embedder: Optional[CodeEmbedder] = None):
+    def __init__(
+        self,
+        project_path: Path,
+        embedder: Optional[CodeEmbedder] = None,
+        db: Optional[Any] = None,
+    ):
         """
         Initialize searcher.
 
         Args:
             project_path: Path to the project
             embedder: CodeEmbedder instance (creates one if not provided)
+            db: Already-open LanceDB connection for the project's index
         """
         self.project_path = Path(project_path).resolve()
         self.rag_dir = self.project_path / ".mini-rag"
@@ -169,7 +181,7 @@ class CodeSearcher:
         self.query_expander = QueryExpander(self.config)
 
         # Initialize database connection
-        self.db = None
+        self.db = db
         self.table = None
         self.bm25 = None
         self.chunk_texts = []
@@ -177,6 +189,16 @@ class CodeSearcher:
         self._connect()
         self._build_bm25_index()
 
+    def _vector_search(self, query_embedding: np.ndarray, limit: int) -> pd.DataFrame:
+        """Nearest chunks to a query embedding, with exact distances."""
+        return (
+            self.table.search(query_embedding)
+            .nprobes(VECTOR_SEARCH_NPROBES)
+            .refine_factor(VECTOR_SEARCH_REFINE_FACTOR)
+            .limit(limit)
+            .to_pandas()
+        )
+
     def _create_matching_embedder(self) -> CodeEmbedder:
         """Create an embedder matching the model used to build the index.
 
@@ -235,7 +257,8 @@ class CodeSearcher:
                 print()
                 raise FileNotFoundError(f"No RAG index found at {self.rag_dir}")
 
-            self.db = lancedb.connect(self.rag_dir)
+            if self.db is None:
+                self.db = lancedb.connect(self.rag_dir)
 
             if "code_vectors" not in self.db.table_names():
                 print("🔧 Index Database Corrupted")
@@ -516,11 +539,7 @@ class CodeSearcher:
             else:
                 query_embedding = query_embedding.astype(np.float32)
 
-            results_df = (
-                self.table.search(query_embedding)
-                .limit(top_k * 3)
-                .to_pandas()
-            )
+            results_df = self._vector_search(query_embedding, top_k * 3)
 
             semantic_results = []
             if not results_df.empty:
@@ -1,9 +1,12 @@
 """Unit tests for configuration system."""
 
+import sys
 import tempfile
+from dataclasses import asdict
 from pathlib import Path
 
 import pytest
+import yaml
 from mini_rag.config import (
     ChunkingConfig,
     ConfigManager,
@@ -11,6 +14,7 @@ from mini_rag.config import (
     RAGConfig,
     SearchConfig,
     ServerConfig,
+    StreamingConfig,
 )
 
 
@@ -44,6 +48,22 @@ class TestConfigDefaults:
         assert config.server is not None
         assert config.embedding is not None
 
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need 3.10+")
+    def test_config_sections_reject_unknown_attributes(self):
+        config = RAGConfig()
+        with pytest.raises(AttributeError):
+            config.search.top_k = 5  # Typo for default_top_k
+
+    def test_to_dict_matches_asdict(self):
+        config = RAGConfig()
+        assert config.to_dict() == asdict(config)
+
+    def test_to_dict_does_not_alias_lists(self):
+        config = RAGConfig()
+        config_dict = config.to_dict()
+        config_dict["files"]["exclude_patterns"].append("extra/**")
+        assert "extra/**" not in config.files.exclude_patterns
+
 
 class TestConfigManager:
     """Test config file loading and saving."""
@@ -74,3 +94,286 @@ class TestConfigManager:
             config1 = manager.load_config()
             config2 = manager.load_config()
             assert config1.chunking.max_size == config2.chunking.max_size
+
+    def test_saved_yaml_preserves_values(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            config = RAGConfig()
+            config.chunking.max_size = 1234
+            config.search.enable_bm25 = False
+            config.files.exclude_patterns = ["vendor/**"]
+            manager.save_config(config)
+
+            data = yaml.safe_load(manager.config_path.read_text())
+            assert data["chunking"]["max_size"] == 1234
+            assert data["search"]["enable_bm25"] is False
+            assert data["files"]["exclude_patterns"] == ["vendor/**"]
+            assert data["llm"]["model_rankings"] == config.llm.model_rankings
+
+    def test_yaml_caps_model_rankings_at_ten(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        config = RAGConfig()
+        config.llm.model_rankings = [f"model-{i}:1b" for i in range(12)]
+        content = manager._create_yaml_with_comments(config.to_dict())
+
+        data = yaml.safe_load(content)
+        assert data["llm"]["model_rankings"] == config.llm.model_rankings[:10]
+        assert "# ... (edit config to see all options)" in content
+
+    def test_yaml_template_placeholders_match_config_fields(self):
+        from string import Formatter
+
+        from mini_rag.config import _YAML_TEMPLATE
+
+        placeholders = {name for _, name, _, _ in Formatter().parse(_YAML_TEMPLATE) if name}
+        flat_fields = {
+            f"{section}_{key}"
+            for section, values in RAGConfig().to_dict().items()
+            for key in values
+        }
+        assert placeholders <= flat_fields
+
+    def test_yaml_with_empty_lists(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        config = RAGConfig()
+        config.files.exclude_patterns = []
+        config.llm.model_rankings = []
+        data = yaml.safe_load(manager._create_yaml_with_comments(config.to_dict()))
+        assert data["files"]["exclude_patterns"] is None
+        assert data["llm"]["model_rankings"] is None
+
+    def test_load_reads_utf8_values(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            manager.rag_dir.mkdir()
+            manager.config_path.write_bytes(
+                "web_scraper:\n  output_dir: recherche-données\n".encode("utf-8")
+            )
+            assert manager.load_config().web_scraper.output_dir == "recherche-données"
+
+    def test_unknown_keys_do_not_discard_config(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            manager.rag_dir.mkdir()
+            manager.config_path.write_text(
+                "chunking:\n  max_size: 1500\n  obsolete_option: true\n"
+                "search:\n  default_top_k: 7\n"
+                "streaming:\n"
+            )
+            config = manager.load_config()
+            assert config.chunking.max_size == 1500
+            assert config.search.default_top_k == 7
+            assert config.streaming.enabled is True
+
+    def test_update_settings_are_loaded(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            config = RAGConfig()
+            config.updates.auto_check = False
+            manager.save_config(config)
+            manager._config = None  # Force a real parse
+            assert manager.load_config().updates.auto_check is False
+
+    def test_repeat_load_uses_cache(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            manager.save_config(RAGConfig())
+            first = manager.load_config()
+
+            def fail_validate(config):
+                raise AssertionError("config should not be re-parsed")
+
+            monkeypatch.setattr(manager, "validate_and_resolve_models", fail_validate)
+            second = manager.load_config()
+            assert second == first
+            assert second is not first
+            second.chunking.max_size = 1
+            assert manager.load_config().chunking.max_size == first.chunking.max_size
+
+    def test_update_config_reuses_loaded_config(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            manager.load_config()
+
+            def fail_validate(config):
+                raise AssertionError("config should not be re-parsed")
+
+            monkeypatch.setattr(manager, "validate_and_resolve_models", fail_validate)
+            config = manager.update_config(search=SearchConfig(default_top_k=3))
+            assert config.search.default_top_k == 3
+            assert manager.load_config().search.default_top_k == 3
+
+    def test_update_config_skips_unchanged_write(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            config = manager.load_config()
+
+            def fail_save(config):
+                raise AssertionError("unchanged config should not be written")
+
+            monkeypatch.setattr(manager, "save_config", fail_save)
+            manager.update_config(search=SearchConfig())
+            manager.update_config(config=config)
+
+    def test_update_config_saves_changes_to_passed_config(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            config = manager.load_config()
+            config.search.default_top_k = 4
+            manager.update_config(config=config)
+            assert "default_top_k: 4" in manager.config_path.read_text()
+
+    def test_update_config_reloads_after_external_edit(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            manager.load_config()
+            content = manager.config_path.read_text().replace(
+                "max_size: 2000", "max_size: 999"
+            )
+            manager.config_path.write_text(content)
+            manager._config_stamp = None  # Simulate an edit within the same mtime tick
+
+            config = manager.update_config()
+            assert config.chunking.max_size == 999
+
+    def test_batch_saves_once(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            manager.load_config()
+            saves = []
+            real_save = manager.save_config
+
+            def counting_save(config):
+                saves.append(config)
+                real_save(config)
+
+            monkeypatch.setattr(manager, "save_config", counting_save)
+            with manager.batch():
+                manager.update_config(search=SearchConfig(default_top_k=4))
+                manager.update_config(chunking=ChunkingConfig(max_size=1500))
+                with manager.batch():
+                    manager.update_config(streaming=StreamingConfig(enabled=False))
+                assert saves == []
+
+            assert len(saves) == 1
+            config = manager.load_config()
+            assert config.search.default_top_k == 4
+            assert config.chunking.max_size == 1500
+            assert config.streaming.enabled is False
+
+    def test_batch_discards_changes_on_error(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = ConfigManager(Path(tmpdir))
+            manager.load_config()
+            with pytest.raises(RuntimeError):
+                with manager.batch():
+                    manager.update_config(search=SearchConfig(default_top_k=4))
+                    raise RuntimeError("abort")
+
+            assert manager.load_config().search.default_top_k == SearchConfig().default_top_k
+
+
+class TestModelNameSanitization:
+    """Test model name sanitization."""
+
+    def test_keeps_valid_model_name(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        assert manager._sanitize_model_name("qwen3:1.7b-q8_0") == "qwen3:1.7b-q8_0"
+
+    def test_strips_disallowed_characters(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        assert manager._sanitize_model_name("qwen3:4b; rm -rf /é") == "qwen3:4brm-rf"
+
+    def test_truncates_long_names(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        assert len(manager._sanitize_model_name("a" * 500)) == 128
+
+
+class TestModelResolution:
+    """Test fuzzy model name resolution."""
+
+    def test_patterns_have_no_duplicates(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        patterns = manager._get_model_patterns("qwen3:1.7b")
+        assert patterns[0] == "qwen3:1.7b"
+        assert len(patterns) == len(set(patterns))
+
+    def test_exact_match_is_case_insensitive(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        assert manager.resolve_model_name("QWEN3:4B", ["llama3:8b", "qwen3:4b"]) == "qwen3:4b"
+
+    def test_resolves_quantized_variant(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        available = ["llama3:8b", "qwen3:1.7b-q8_0"]
+        assert manager.resolve_model_name("qwen3:1.7b", available) == "qwen3:1.7b-q8_0"
+
+    def test_rejects_different_version(self):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        assert manager.resolve_model_name("qwen3:1.7b", ["qwen3:11.7b"]) is None
+
+    def test_validate_resolves_all_models(self, monkeypatch):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        monkeypatch.setattr(
+            manager,
+            "get_available_ollama_models",
+            lambda host: ["qwen3:4b-q4_0", "qwen3:1.7b-q8_0"],
+        )
+        config = RAGConfig()
+        config.llm.synthesis_model = "qwen3:1.7b"
+        config = manager.validate_and_resolve_models(config)
+        assert config.llm.synthesis_model == "qwen3:1.7b-q8_0"
+        assert config.llm.model_rankings[:3] == [
+            "qwen3:1.7b-q8_0",
+            "qwen3:0.6b",
+            "qwen3:4b-q4_0",
+        ]
+
+    def test_validate_resolves_each_name_once(self, monkeypatch):
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+        monkeypatch.setattr(manager, "get_available_ollama_models", lambda host: ["qwen3:4b"])
+        calls = []
+        original = manager.resolve_model_name
+
+        def counting_resolve(model, *args, **kwargs):
+            calls.append(model)
+            return original(model, *args, **kwargs)
+
+        monkeypatch.setattr(manager, "resolve_model_name", counting_resolve)
+        config = RAGConfig()
+        config.llm.synthesis_model = "qwen3:4b"
+        config.llm.model_rankings = ["qwen3:4b", "qwen3:1.7b", "qwen3:4b"]
+        manager.validate_and_resolve_models(config)
+        assert sorted(calls) == ["qwen3:1.7b", "qwen3:4b"]
+
+
+class TestOllamaProbe:
+    """Test the retry budget for listing Ollama models."""
+
+    @pytest.mark.parametrize(
+        "host, attempts",
+        [
+            ("localhost:11434", 1),
+            ("127.0.0.1:11434", 1),
+            ("[::1]:11434", 1),
+            ("localhost.attacker.net:11434", 3),
+            ("127.0.0.10:11434", 3),
+            ("ollama.internal:11434", 3),
+        ],
+    )
+    def test_only_exact_local_hosts_skip_retries(self, monkeypatch, host, attempts):
+        import time
+
+        import requests
+
+        calls = []
+
+        def refuse(url, **kwargs):
+            calls.append(kwargs["timeout"])
+            raise requests.exceptions.ConnectionError("refused")
+
+        monkeypatch.setattr(requests, "get", refuse)
+        monkeypatch.setattr(time, "sleep", lambda seconds: None)
+        manager = ConfigManager(Path(tempfile.gettempdir()))
+
+        assert manager.get_available_ollama_models(host) == []
+        assert len(calls) == attempts
@@ -0,0 +1,93 @@
+"""Tests for OllamaEmbedder request batching and query embedding."""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+import requests
+
+from mini_rag.ollama_embeddings import OllamaEmbedder
+
+
+@pytest.fixture
+def embedder():
+    with patch.object(OllamaEmbedder, "_initialize_providers"):
+        emb = OllamaEmbedder(model_name="test-model", embedding_dim=4)
+    emb.mode = "openai"
+    return emb
+
+
+def _response(count, start=0):
+    response = MagicMock()
+    response.json.return_value = {
+        "data": [
+            {"index": i, "embedding": [float(start + i)] * 4} for i in reversed(range(count))
+        ]
+    }
+    return response
+
+
+class TestBatchedEmbedding:
+    """Test one request per batch on OpenAI-compatible endpoints."""
+
+    def test_list_is_sent_in_one_request(self, embedder):
+        with patch(
+            "mini_rag.ollama_embeddings.requests.post", return_value=_response(3)
+        ) as post:
+            embeddings = embedder.embed_code(["a = 1", "b = 2", "c = 3"])
+
+        post.assert_called_once()
+        assert len(post.call_args.kwargs["json"]["input"]) == 3
+        # Results are put back in input order
+        assert embeddings.shape == (3, 4)
+        assert [row[0] for row in embeddings] == [0.0, 1.0, 2.0]
+
+    def test_large_lists_are_split(self, embedder, monkeypatch):
+        monkeypatch.setattr(OllamaEmbedder, "MAX_BATCH_TEXTS", 2)
+        with patch(
+            "mini_rag.ollama_embeddings.requests.post",
+            side_effect=[_response(2), _response(1)],
+        ) as post:
+            embeddings = embedder.embed_code(["a", "b", "c"])
+
+        assert post.call_count == 2
+        assert embeddings.shape == (3, 4)
+
+    def test_failed_batch_falls_back_per_chunk(self, embedder):
+        single = MagicMock()
+        single.json.return_value = {"data": [{"embedding": [1.0] * 4}]}
+        with patch(
+            "mini_rag.ollama_embeddings.requests.post",
+            side_effect=[requests.exceptions.ConnectionError("reset"), single, single],
+        ) as post:
+            embeddings = embedder.embed_code(["a", "b"])
+
+        assert post.call_count == 3
+        assert np.array_equal(embeddings, np.ones((2, 4), dtype=np.float32))
+
+    def test_batched_matrix_is_returned_without_copying(self, embedder):
+        matrix = np.ones((2, 4), dtype=np.float32)
+        with patch.object(OllamaEmbedder, "_get_embeddings_batched", return_value=matrix):
+            embeddings = embedder.embed_code(["a", "b"])
+
+        assert embeddings is matrix
+
+
+class TestQueryEmbedding:
+    """Test embedding of search queries."""
+
+    def test_repeated_query_is_embedded_once(self, embedder):
+        vector = np.ones(4, dtype=np.float32)
+        with patch.object(OllamaEmbedder, "_get_embedding", return_value=vector) as get:
+            first = embedder.embed_query("where is login handled")
+            second = embedder.embed_query("where is login handled")
+
+        get.assert_called_once_with("Search for code related to: where is login handled")
+        assert second is first
+
+    def test_text_is_embedded_without_query_framing(self, embedder):
+        vector = np.ones(4, dtype=np.float32)
+        with patch.object(OllamaEmbedder, "_get_embedding", return_value=vector) as get:
+            embedder.embed_text("where is login handled")
+
+        get.assert_called_once_with("where is login handled")
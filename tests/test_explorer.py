@@ -0,0 +1,360 @@
+"""Tests for the interactive code explorer."""
+
+import hashlib
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from mini_rag import explorer as explorer_module
+from mini_rag.config import RAGConfig
+from mini_rag.explorer import CodeExplorer, ExplorationSession
+from mini_rag.llm_synthesizer import SynthesisResult
+from mini_rag.ollama_embeddings import OllamaEmbedder
+
+
+@pytest.fixture
+def mock_components(monkeypatch):
+    """Replace the searcher and synthesizer with mocks and reset the shared cache."""
+    searcher_cls = MagicMock(name="CodeSearcher")
+    synthesizer_cls = MagicMock(name="LLMSynthesizer")
+    monkeypatch.setattr(explorer_module, "CodeSearcher", searcher_cls)
+    monkeypatch.setattr(explorer_module, "LLMSynthesizer", synthesizer_cls)
+    explorer_module.clear_component_cache()
+    yield searcher_cls, synthesizer_cls
+    explorer_module.clear_component_cache()
+
+
+class TestSharedComponents:
+    """Test searcher/synthesizer reuse across explorers."""
+
+    def test_explorers_share_components(self, mock_components, tmp_path):
+        searcher_cls, synthesizer_cls = mock_components
+        first = CodeExplorer(tmp_path)
+        second = CodeExplorer(tmp_path)
+        assert first.searcher is second.searcher
+        assert first.synthesizer is second.synthesizer
+        assert searcher_cls.call_count == 1
+        assert synthesizer_cls.call_count == 1
+
+    def test_different_models_get_separate_synthesizers(self, mock_components, tmp_path):
+        _, synthesizer_cls = mock_components
+        config = RAGConfig()
+        config.llm.synthesis_model = "qwen3:4b"
+        CodeExplorer(tmp_path)
+        CodeExplorer(tmp_path, config)
+        assert synthesizer_cls.call_count == 2
+
+    def test_synthesizers_share_http_session(self, mock_components, tmp_path):
+        _, synthesizer_cls = mock_components
+        CodeExplorer(tmp_path)
+        session = synthesizer_cls.call_args.kwargs["session"]
+        assert session is explorer_module._ollama_session
+
+    def test_clear_component_cache(self, mock_components, tmp_path):
+        searcher_cls, _ = mock_components
+        CodeExplorer(tmp_path)
+        explorer_module.clear_component_cache()
+        CodeExplorer(tmp_path)
+        assert searcher_cls.call_count == 2
+
+    def test_reindex_replaces_cached_searcher(self, mock_components, tmp_path):
+        searcher_cls, _ = mock_components
+        manifest = tmp_path / ".mini-rag" / "manifest.json"
+        manifest.parent.mkdir()
+        manifest.write_text("{}")
+        CodeExplorer(tmp_path)
+        CodeExplorer(tmp_path)
+        assert searcher_cls.call_count == 1
+
+        # Re-indexing rewrites the manifest
+        stat = manifest.stat()
+        os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        CodeExplorer(tmp_path)
+
+        assert searcher_cls.call_count == 2
+
+
+def _synthesis(summary):
+    return SynthesisResult(
+        summary=summary, key_points=[], code_examples=[], suggested_actions=[], confidence=0.8
+    )
+
+
+def _result(file_path="auth.py", content="def login(): pass", score=0.9):
+    return SimpleNamespace(file_path=file_path, content=content, score=score)
+
+
+@pytest.fixture
+def session(tmp_path):
+    return ExplorationSession(
+        project_path=tmp_path, conversation_history=[], session_id="test", started_at=0.0
+    )
+
+
+class TestSessionContext:
+    """Test the rendered conversation context kept on the session."""
+
+    def test_empty_session_has_no_context(self, session):
+        assert session.context_summary == ""
+
+    def test_context_keeps_last_three_exchanges(self, session):
+        for i in range(1, 5):
+            session.add_exchange(f"question {i}", [], _synthesis(f"answer {i}"))
+
+        assert "question 1" not in session.context_summary
+        assert "Previous Q4: question 4" in session.context_summary
+        assert "Previous A2: answer 2" in session.context_summary
+        assert len(session.conversation_history) == 4
+        assert len(session.context_blocks) == 3
+
+    def test_elapsed_ignores_wall_clock_changes(self, session, monkeypatch):
+        monkeypatch.setattr(explorer_module.time, "time", lambda: 0.0)
+        assert 0.0 <= session.elapsed() < 5.0
+
+
+class TestContextualPrompt:
+    """Test exploration prompt construction."""
+
+    def test_prompt_interpolates_question_results_and_context(
+        self, mock_components, session, tmp_path
+    ):
+        explorer = CodeExplorer(tmp_path)
+        explorer.current_session = session
+        session.add_exchange("what is auth?", [], _synthesis("auth handles login"))
+
+        prompt = explorer._build_contextual_prompt("how do I log out?", [_result()])
+
+        assert '"how do I log out?"' in prompt
+        assert "File: auth.py" in prompt
+        assert "Previous A1: auth handles login" in prompt
+        assert f"PROJECT: {tmp_path.name}" in prompt
+        assert "{question}" not in prompt
+
+    def test_system_context_built_once(self, mock_components, session, tmp_path, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            explorer_module, "get_system_context", lambda path: calls.append(path) or "[Linux]"
+        )
+        explorer = CodeExplorer(tmp_path)
+        explorer.current_session = session
+
+        explorer._build_contextual_prompt("q1", [_result()])
+        prompt = explorer._build_contextual_prompt("q2", [_result()])
+
+        assert "System context: [Linux]" in prompt
+        assert len(calls) == 1
+
+    def test_result_content_is_truncated(self, mock_components, session, tmp_path):
+        explorer = CodeExplorer(tmp_path)
+        explorer.current_session = session
+
+        prompt = explorer._build_contextual_prompt("q", [_result(content="x" * 2000)])
+
+        assert "x" * explorer_module.RESULT_CONTENT_CHARS + "..." in prompt
+        assert "x" * (explorer_module.RESULT_CONTENT_CHARS + 1) not in prompt
+
+    def test_results_stop_when_budget_is_spent(self, mock_components, session, tmp_path):
+        explorer = CodeExplorer(tmp_path)
+        explorer.current_session = session
+        results = [_result(file_path=f"f{i}.py", content="y" * 2000) for i in range(8)]
+
+        prompt = explorer._build_contextual_prompt("q", results)
+
+        shown = explorer_module.RESULTS_CONTEXT_BUDGET // explorer_module.RESULT_CONTENT_CHARS
+        assert f"File: f{shown - 1}.py" in prompt
+        assert f"File: f{shown + 1}.py" not in prompt
+
+    def test_format_exploration_response(self, mock_components, session, tmp_path):
+        explorer = CodeExplorer(tmp_path)
+        explorer.current_session = session
+        session.add_exchange("q1", [], _synthesis("a1"))
+        session.add_exchange("q2", [], _synthesis("a2"))
+
+        output = explorer._format_exploration_response("q2", _synthesis("a2"), 5, 0.5, 1.0)
+
+        lines = output.split("\n")
+        assert lines[0] == "🧠 EXPLORATION ANALYSIS (Question #2)"
+        assert "Results: 5 | Time: 1.5s" in lines[1]
+        assert lines[-1] == "🟢 Confidence: 80.0% | Context: 1 previous questions"
+
+
+class TestAnswerReuse:
+    """Test reuse of answers for rephrased questions."""
+
+    @pytest.fixture
+    def explorer(self, mock_components, tmp_path, monkeypatch):
+        explorer = CodeExplorer(tmp_path)
+        explorer.current_session = ExplorationSession(
+            project_path=tmp_path, conversation_history=[], session_id="test", started_at=0.0
+        )
+        explorer.searcher.search.return_value = [_result()]
+        monkeypatch.setattr(
+            explorer,
+            "_synthesize_with_context",
+            MagicMock(return_value=_synthesis("auth answer")),
+        )
+        monkeypatch.setattr(explorer_module, "get_system_context", lambda path: "")
+        return explorer
+
+    def test_similar_question_reuses_answer(self, explorer, capsys):
+        explorer.searcher.embedder.embed_text.side_effect = [
+            np.array([1.0, 0.0, 0.0]),
+            np.array([0.99, 0.05, 0.0]),
+        ]
+        explorer.explore_question("how does auth work?")
+        status = explorer.explore_question("explain authentication")
+
+        assert "Reused answer" in status
+        assert explorer._synthesize_with_context.call_count == 1
+        assert explorer.searcher.search.call_count == 1
+        assert "auth answer" in capsys.readouterr().out
+        assert len(explorer.current_session.conversation_history) == 2
+
+    def test_different_question_is_answered(self, explorer):
+        explorer.searcher.embedder.embed_text.side_effect = [
+            np.array([1.0, 0.0, 0.0]),
+            np.array([0.0, 1.0, 0.0]),
+        ]
+        explorer.explore_question("how does auth work?")
+        explorer.explore_question("how is the index built?")
+        assert explorer._synthesize_with_context.call_count == 2
+
+    def test_failed_answers_are_not_reused(self, explorer):
+        explorer.searcher.embedder.embed_text.return_value = np.array([1.0, 0.0])
+        failed = _synthesis("Analysis failed")
+        failed.confidence = 0.0
+        explorer._synthesize_with_context.return_value = failed
+        explorer.explore_question("how does auth work?")
+        explorer.explore_question("how does auth work?")
+        assert explorer._synthesize_with_context.call_count == 2
+
+    def test_embedding_errors_skip_reuse(self, explorer):
+        explorer.searcher.embedder.embed_text.side_effect = RuntimeError("no provider")
+        explorer.explore_question("how does auth work?")
+        explorer.explore_question("how does auth work?")
+        assert explorer._synthesize_with_context.call_count == 2
+
+    def test_answer_from_another_context_is_not_reused(self, explorer):
+        explorer.searcher.embedder.embed_text.side_effect = [
+            np.array([1.0, 0.0, 0.0]),
+            np.array([0.0, 1.0, 0.0]),
+            np.array([1.0, 0.0, 0.0]),
+        ]
+        explorer.explore_question("how does auth work?")
+        explorer.explore_question("how is the index built?")
+        explorer.explore_question("how does auth work?")
+        assert explorer._synthesize_with_context.call_count == 3
+
+    def test_zero_threshold_disables_reuse(self, explorer):
+        explorer.config.llm.answer_reuse_similarity = 0
+        explorer.searcher.embedder.embed_text.return_value = np.array([1.0, 0.0])
+        explorer.explore_question("how does auth work?")
+        explorer.explore_question("how does auth work?")
+        assert explorer._synthesize_with_context.call_count == 2
+        explorer.searcher.embedder.embed_text.assert_not_called()
+
+    def test_short_near_miss_questions_get_their_own_answers(self, explorer):
+        def trigram_embedding(text):
+            vector = np.zeros(512, dtype=np.float32)
+            text = text.lower()
+            for i in range(len(text) - 2):
+                digest = hashlib.md5(text[i : i + 3].encode()).hexdigest()
+                vector[int(digest, 16) % 512] += 1
+            return vector
+
+        with patch.object(OllamaEmbedder, "_initialize_providers"):
+            embedder = OllamaEmbedder(model_name="test-model", embedding_dim=512)
+        embedder._get_embedding = trigram_embedding
+        explorer.searcher.embedder = embedder
+        first, second = "how is X validated", "how is Y validated"
+
+        # The shared search prefix alone would push these over the threshold
+        prefixed = [embedder.embed_query(q) for q in (first, second)]
+        prefixed = [v / np.linalg.norm(v) for v in prefixed]
+        assert prefixed[0] @ prefixed[1] >= explorer.config.llm.answer_reuse_similarity
+
+        explorer.explore_question(first)
+        explorer.explore_question(second)
+        assert explorer._synthesize_with_context.call_count == 2
+
+
+class TestThinkingSplitter:
+    """Test single-pass splitting of streamed thinking output."""
+
+    def test_splits_tagged_thinking(self):
+        splitter = explorer_module._ThinkingSplitter()
+        shown = [
+            splitter.feed(c) for c in ["<think>look at ", "auth</think>", "Auth uses tokens."]
+        ]
+        assert shown == ["look at ", "auth", ""]
+        assert splitter.finish() == ("look at auth", "Auth uses tokens.")
+        assert splitter.saw_tags
+
+    def test_tags_split_across_chunks(self):
+        splitter = explorer_module._ThinkingSplitter()
+        for chunk in ["<thi", "nk>reasoning</th", "ink>", "answer <b>"]:
+            splitter.feed(chunk)
+        assert splitter.finish() == ("reasoning", "answer <b>")
+
+    def test_untagged_output_is_answer(self):
+        splitter = explorer_module._ThinkingSplitter()
+        assert splitter.feed("plain answer <") == ""
+        assert splitter.finish() == ("", "plain answer <")
+        assert not splitter.saw_tags
+
+    def test_unclosed_thinking_kept_as_answer(self):
+        splitter = explorer_module._ThinkingSplitter()
+        splitter.feed("Intro <think>still going")
+        assert splitter.finish() == ("", "Intro still going")
+
+
+class TestModelRestart:
+    """Test model unload handling."""
+
+    def test_restart_unloads_model_over_http(self, mock_components, tmp_path, monkeypatch):
+        explorer = CodeExplorer(tmp_path)
+        explorer.synthesizer.ollama_url = "http://localhost:11434"
+        explorer.synthesizer.model = "qwen3:1.7b"
+        monkeypatch.setattr("builtins.input", lambda: "y")
+        post = MagicMock()
+        monkeypatch.setattr(explorer_module._ollama_session, "post", post)
+
+        assert explorer._handle_model_restart() is True
+        post.assert_called_once_with(
+            "http://localhost:11434/api/generate",
+            json={"model": "qwen3:1.7b", "keep_alive": 0},
+            timeout=10,
+        )
+
+    def test_restart_declined(self, mock_components, tmp_path, monkeypatch):
+        explorer = CodeExplorer(tmp_path)
+        monkeypatch.setattr("builtins.input", lambda: "n")
+        post = MagicMock()
+        monkeypatch.setattr(explorer_module._ollama_session, "post", post)
+
+        assert explorer._handle_model_restart() is False
+        post.assert_not_called()
+
+    def test_restart_probe_is_memoized(self, mock_components, tmp_path, monkeypatch):
+        monkeypatch.setattr(explorer_module, "_restart_probe_results", {})
+        explorer = CodeExplorer(tmp_path)
+        explorer.synthesizer._call_ollama.return_value = "4"
+
+        assert explorer._check_model_restart_needed() is True
+        assert explorer._check_model_restart_needed() is True
+        assert explorer.synthesizer._call_ollama.call_count == 1
+
+    def test_restart_clears_probe_result(self, mock_components, tmp_path, monkeypatch):
+        monkeypatch.setattr(explorer_module, "_restart_probe_results", {})
+        explorer = CodeExplorer(tmp_path)
+        explorer.synthesizer._call_ollama.return_value = "4"
+        explorer._check_model_restart_needed()
+        monkeypatch.setattr("builtins.input", lambda: "y")
+        monkeypatch.setattr(explorer_module._ollama_session, "post", MagicMock())
+
+        explorer._handle_model_restart()
+        explorer._check_model_restart_needed()
+        assert explorer.synthesizer._call_ollama.call_count == 2
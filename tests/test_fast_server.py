@@ -0,0 +1,432 @@
+"""Tests for the fast server's length-prefixed JSON framing."""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from mini_rag import fast_server
+
+
+@pytest.fixture
+def sock_pair():
+    left, right = socket.socketpair()
+    yield left, right
+    left.close()
+    right.close()
+
+
+class TestMessageFraming:
+    """Test message send/receive over a socket pair."""
+
+    def test_roundtrip(self, sock_pair):
+        left, right = sock_pair
+        message = {"query": "héllo wörld", "top_k": 5, "results": [{"score": 0.5}]}
+        fast_server._send_message(left, message)
+        assert fast_server._receive_message(right) == message
+
+    def test_wire_format_is_length_prefixed_json(self, sock_pair):
+        left, right = sock_pair
+        fast_server._send_message(left, {"command": "status"})
+        length = int.from_bytes(right.recv(4), "big")
+        assert json.loads(right.recv(length)) == {"command": "status"}
+
+    def test_reassembles_partial_writes(self, sock_pair):
+        left, right = sock_pair
+        body = json.dumps({"query": "x" * 5000}).encode("utf-8")
+        frame = len(body).to_bytes(4, "big") + body
+        for i in range(0, len(frame), 1000):
+            left.sendall(frame[i : i + 1000])
+        assert fast_server._receive_message(right) == {"query": "x" * 5000}
+
+    def test_partial_scatter_write_is_completed(self):
+        class ShortWriteSocket:
+            def __init__(self):
+                self.data = b""
+
+            def sendmsg(self, buffers):
+                self.data += b"".join(buffers)[:2]
+                return 2
+
+            def sendall(self, data):
+                self.data += bytes(data)
+
+        sock = ShortWriteSocket()
+        fast_server._send_message(sock, {"query": "auth"})
+        body = json.dumps({"query": "auth"}, separators=(",", ":")).encode()
+        assert sock.data == len(body).to_bytes(4, "big") + body
+
+    def test_rejects_oversized_message(self, sock_pair):
+        left, right = sock_pair
+        left.sendall((100).to_bytes(4, "big"))
+        with pytest.raises(ValueError, match="too large"):
+            fast_server._receive_message(right, max_size=10)
+
+    def test_closed_connection(self, sock_pair):
+        left, right = sock_pair
+        left.sendall(b"\x00\x00")
+        left.close()
+        with pytest.raises(ConnectionError, match="length"):
+            fast_server._receive_message(right)
+
+
+class TestServerStatus:
+    """Test status reporting."""
+
+    def test_uptime_ignores_wall_clock_changes(self, monkeypatch):
+        status = fast_server.ServerStatus()
+        monkeypatch.setattr(fast_server.time, "time", lambda: 0.0)
+        assert 0 <= status.get_status()["uptime"] < 5
+
+    def test_status_bursts_are_coalesced(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fast_server, "STATUS_NOTIFY_INTERVAL", 0.05)
+        server = fast_server.FastRAGServer(tmp_path)
+        seen = []
+        server.add_status_callback(lambda status: seen.append(status["message"]))
+
+        for i in range(20):
+            server.status.update("indexing", i, f"step {i}")
+            server._notify_status()
+        assert seen == ["step 0"]
+
+        time.sleep(0.2)
+        assert seen == ["step 0", "step 19"]
+
+        server.status.set_ready()
+        server._notify_status()
+        assert seen[-1] == "Server ready and accepting connections"
+        server.stop()
+
+
+class TestServerLifecycle:
+    """Test server worker and health-check threads."""
+
+    def test_stop_from_client_worker_does_not_block(self, tmp_path):
+        server = fast_server.FastRAGServer(tmp_path, auto_index=False)
+        future = server.client_executor.submit(server.stop)
+        future.result(timeout=5)
+        assert server._health_stop.is_set()
+
+    def test_health_checks_run_on_timer(self, tmp_path, monkeypatch):
+        server = fast_server.FastRAGServer(tmp_path, auto_index=False)
+        server.health_check_interval = 0.01
+        calls = []
+
+        def fake_checks():
+            calls.append(1)
+            if len(calls) >= 2:
+                server._health_stop.set()
+
+        monkeypatch.setattr(server, "_run_health_checks", fake_checks)
+        server._health_check_loop()
+        assert len(calls) == 2
+        server.stop()
+
+    def test_free_port_bound_without_killing(self, tmp_path, monkeypatch):
+        server = fast_server.FastRAGServer(tmp_path, port=0, auto_index=False)
+        kill = MagicMock()
+        monkeypatch.setattr(server, "_kill_existing_server", kill)
+        sock = server._bind_port()
+        sock.close()
+        kill.assert_not_called()
+        server.stop()
+
+    def test_busy_port_cleared_then_rebound(self, tmp_path, monkeypatch):
+        holder = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        holder.bind(("localhost", 0))
+        holder.listen(1)
+        port = holder.getsockname()[1]
+        server = fast_server.FastRAGServer(tmp_path, port=port, auto_index=False)
+        monkeypatch.setattr(server, "_kill_existing_server", holder.close)
+        sock = server._bind_port()
+        assert sock.getsockname()[1] == port
+        sock.close()
+        server.stop()
+
+    def test_second_server_bind_goes_down_kill_path(self, tmp_path, monkeypatch):
+        first = fast_server.FastRAGServer(tmp_path, port=0, auto_index=False)
+        holder = first._create_bound_socket()
+        holder.listen(1)
+        server = fast_server.FastRAGServer(
+            tmp_path, port=holder.getsockname()[1], auto_index=False
+        )
+        kill = MagicMock(side_effect=holder.close)
+        monkeypatch.setattr(server, "_kill_existing_server", kill)
+        sock = server._bind_port()
+        kill.assert_called_once()
+        sock.close()
+        first.stop()
+        server.stop()
+
+    def test_windows_binds_exclusively(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fast_server.sys, "platform", "win32")
+        monkeypatch.setattr(socket, "SO_EXCLUSIVEADDRUSE", -5, raising=False)
+        fake_socket = MagicMock()
+        monkeypatch.setattr(fast_server.socket, "socket", MagicMock(return_value=fake_socket))
+        server = fast_server.FastRAGServer(tmp_path, auto_index=False)
+        server._create_bound_socket()
+        options = [call.args[1] for call in fake_socket.setsockopt.call_args_list]
+        assert options == [-5]
+        server.stop()
+
+    def test_port_owner_found_without_subprocess(self, tmp_path):
+        holder = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        holder.bind(("localhost", 0))
+        holder.listen(1)
+        server = fast_server.FastRAGServer(
+            tmp_path, port=holder.getsockname()[1], auto_index=False
+        )
+        try:
+            assert os.getpid() in server._port_owner_pids()
+        finally:
+            holder.close()
+            server.stop()
+
+
+class TestResultCache:
+    """Test reuse of recent search results."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        server = fast_server.FastRAGServer(tmp_path, auto_index=False)
+        server.searcher = MagicMock()
+        result = MagicMock()
+        result.to_dict.return_value = {"file_path": "auth.py", "score": 0.03}
+        server.searcher.search.return_value = [result]
+        yield server
+        server.stop()
+
+    def test_repeat_query_is_cached(self, server):
+        first = server._cached_search("auth flow", 5)
+        second = server._cached_search("  auth flow ", 5)
+        assert first == second == [{"file_path": "auth.py", "score": 0.03}]
+        assert server.searcher.search.call_count == 1
+
+    def test_top_k_is_part_of_key(self, server):
+        server._cached_search("auth flow", 5)
+        server._cached_search("auth flow", 10)
+        assert server.searcher.search.call_count == 2
+
+    def test_entries_expire(self, server, monkeypatch):
+        monkeypatch.setattr(fast_server, "RESULT_CACHE_TTL", -1.0)
+        server._cached_search("auth flow", 5)
+        server._cached_search("auth flow", 5)
+        assert server.searcher.search.call_count == 2
+
+    def test_cache_is_bounded(self, server, monkeypatch):
+        monkeypatch.setattr(fast_server, "RESULT_CACHE_SIZE", 2)
+        for query in ("a", "b", "c"):
+            server._cached_search(query, 5)
+        assert list(server._result_cache) == [("b", 5), ("c", 5)]
+
+
+class TestHealthChecks:
+    """Test the periodic health probe against a real table."""
+
+    def test_probe_reuses_embedding_and_scans_metadata(self, tmp_path):
+        import lancedb
+
+        db = lancedb.connect(tmp_path / "db")
+        table = db.create_table(
+            "code_vectors",
+            data=[
+                {"vector": np.ones(4, dtype=np.float32), "language": "python"},
+                {"vector": np.zeros(4, dtype=np.float32), "language": "markdown"},
+                {"vector": np.ones(4, dtype=np.float32), "language": "python"},
+            ],
+        )
+        server = fast_server.FastRAGServer(tmp_path, auto_index=False)
+        server.embedder = MagicMock()
+        server.embedder.embed_code.return_value = np.ones(4, dtype=np.float32)
+        server.searcher = MagicMock()
+        server.searcher.table = table
+
+        server._run_health_checks()
+        server._run_health_checks()
+
+        checks = server.status.health_checks
+        assert checks["database"] == {"status": "healthy", "chunks": 3, "languages": 2}
+        assert checks["search"] == {"status": "healthy", "test_results": 1}
+        assert server.embedder.embed_code.call_count == 1
+        server.searcher.search.assert_not_called()
+        server.stop()
+
+
+class TestComponentInit:
+    """Test overlapping the database open with the embedder load."""
+
+    def _init(self, tmp_path, monkeypatch, needs_indexing):
+        searcher = MagicMock()
+        monkeypatch.setattr("mini_rag.ollama_embeddings.OllamaEmbedder", MagicMock())
+        monkeypatch.setattr("mini_rag.search.CodeSearcher", searcher)
+        server = fast_server.FastRAGServer(tmp_path, auto_index=False)
+        monkeypatch.setattr(server, "_check_indexing_needed", lambda: needs_indexing)
+        monkeypatch.setattr(server, "_run_health_checks", lambda: None)
+        assert server._initialize_components()
+        server.stop()
+        return searcher.call_args.kwargs["db"]
+
+    def test_existing_index_opened_during_embedder_load(self, tmp_path, monkeypatch):
+        (tmp_path / ".mini-rag").mkdir()
+        db = self._init(tmp_path, monkeypatch, needs_indexing=False)
+        assert db is not None
+        assert db.uri.endswith(".mini-rag")
+
+    def test_new_index_opened_by_searcher(self, tmp_path, monkeypatch):
+        assert self._init(tmp_path, monkeypatch, needs_indexing=True) is None
+
+
+class _FakeIndexer:
+    def __init__(self, project_path, embedder=None, max_workers=1):
+        self.files = ["a.py", "b.py", "c.py"]
+        self._progress_callback = None
+
+    def set_progress_callback(self, callback):
+        self._progress_callback = callback
+
+    def _process_file(self, path):
+        if path == "b.py":
+            raise OSError("unreadable")
+        return path
+
+    def index_project(self, force_reindex=False):
+        for done, path in enumerate(self.files, 1):
+            try:
+                self._process_file(path)
+            except OSError:
+                pass
+            self._progress_callback(done, len(self.files), done)
+        return {"files_indexed": 2, "chunks_created": 4, "time_taken": 0.1}
+
+
+class TestIndexingProgress:
+    """Test callback-driven indexing progress."""
+
+    def test_progress_counts_every_processed_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("mini_rag.indexer.ProjectIndexer", _FakeIndexer)
+        monkeypatch.setattr(fast_server, "STATUS_NOTIFY_INTERVAL", 0.0)
+        server = fast_server.FastRAGServer(tmp_path)
+        updates = []
+        server.add_status_callback(lambda status: updates.append(status["message"]))
+
+        assert server._fast_index() is True
+        assert "Indexed 3/3 files" in updates
+        server.stop()
+
+
+class TestRequestLogging:
+    """Test the non-blocking request log writer."""
+
+    def test_lines_are_printed_in_order_and_flushed_on_stop(self, tmp_path, monkeypatch):
+        printed = []
+        monkeypatch.setattr(fast_server.console, "print", printed.append)
+        server = fast_server.FastRAGServer(tmp_path)
+        for i in range(3):
+            server._log_request(f"line {i}")
+        server._log_q.put(None)
+
+        server._log_worker()
+        assert "\n".join(printed) == "line 0\nline 1\nline 2"
+
+    def test_full_queue_drops_lines(self, tmp_path):
+        server = fast_server.FastRAGServer(tmp_path)
+        server._log_q = fast_server.queue.Queue(maxsize=1)
+        server._log_request("kept")
+        server._log_request("dropped")
+        assert server._log_q.get_nowait() == "kept"
+        assert server._log_q.empty()
+
+
+class TestCommandDispatch:
+    """Test request routing in the client handler."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        server = fast_server.FastRAGServer(tmp_path)
+        yield server
+        server.stop()
+
+    def _request(self, server, sock_pair, request):
+        left, right = sock_pair
+        fast_server._send_message(left, request)
+        server._handle_client(right)
+        return fast_server._receive_message(left)
+
+    def test_status_command(self, server, sock_pair):
+        response = self._request(server, sock_pair, {"command": "status"})
+        assert response["success"] is True
+        assert response["status"]["phase"] == "initializing"
+
+    def test_search_request(self, server, sock_pair, monkeypatch):
+        monkeypatch.setattr(server, "_cached_search", lambda query, top_k: [{"q": query}])
+        response = self._request(server, sock_pair, {"query": "auth", "top_k": 3})
+        assert response["results"] == [{"q": "auth"}]
+        assert response["total_queries"] == 1
+
+    def _serve_once(self, server):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("localhost", 0))
+        listener.listen(1)
+
+        def accept():
+            client, _ = listener.accept()
+            server._handle_client(client)
+            listener.close()
+
+        threading.Thread(target=accept, daemon=True).start()
+        return fast_server.FastRAGClient(port=listener.getsockname()[1])
+
+    def test_streamed_search_sends_one_frame_per_result(self, server, monkeypatch):
+        monkeypatch.setattr(
+            server, "_cached_search", lambda query, top_k: [{"rank": i} for i in range(top_k)]
+        )
+        client = self._serve_once(server)
+        assert list(client.search_stream("auth", top_k=3)) == [
+            {"rank": 0},
+            {"rank": 1},
+            {"rank": 2},
+        ]
+
+    def test_ping_is_answered_without_json(self, server):
+        client = self._serve_once(server)
+        assert client.is_running() is True
+
+    def test_ping_without_server(self):
+        probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        probe.bind(("localhost", 0))
+        port = probe.getsockname()[1]
+        probe.close()
+        assert fast_server.FastRAGClient(port=port).is_running() is False
+
+    def test_streamed_search_raises_server_error(self, server):
+        client = self._serve_once(server)
+        with pytest.raises(RuntimeError, match="Empty query"):
+            list(client.search_stream(""))
+
+    def test_empty_query_is_an_error(self, server, sock_pair):
+        response = self._request(server, sock_pair, {"command": "unknown"})
+        assert response == {
+            "success": False,
+            "error": "Empty query",
+            "error_type": "ValueError",
+            "server_status": "initializing",
+        }
+
+
+def test_import_skips_search_stack():
+    code = (
+        "import sys, mini_rag.fast_server; "
+        "print(any(m in sys.modules"
+        " for m in ('lancedb', 'mini_rag.search', 'mini_rag.indexer')))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "False"
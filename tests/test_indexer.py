@@ -0,0 +1,498 @@
+"""Tests for ProjectIndexer file tracking."""
+
+import hashlib
+import os
+import threading
+from pathlib import PureWindowsPath
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from mini_rag import indexer as indexer_module
+from mini_rag.indexer import ProjectIndexer, RecordColumns
+
+
+class _CountingEmbedder:
+    """Embedder stand-in that records the size of each embed call."""
+
+    model_name = "test-model"
+    embedding_dim = 8
+    supports_images = False
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def embed_code(self, texts):
+        self.calls.append(len(texts))
+        self.threads.add(threading.current_thread().name)
+        return np.ones((len(texts), self.embedding_dim), dtype=np.float32)
+
+    def get_embedding_dim(self):
+        return self.embedding_dim
+
+    def get_mode(self):
+        return "test"
+
+
+def _expected_hash(path):
+    if indexer_module.xxhash is not None:
+        return indexer_module.xxhash.xxh3_64(path.read_bytes()).hexdigest()
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+_INT_COLUMNS = {"start_line", "end_line", "file_lines", "chunk_index", "total_chunks"}
+
+
+@pytest.fixture
+def indexer(tmp_project):
+    return ProjectIndexer(tmp_project, embedder=MagicMock())
+
+
+class TestFileHashing:
+    """Test content hashing used for change detection."""
+
+    def test_hash_matches_algorithm(self, indexer, tmp_project):
+        path = tmp_project / "auth.py"
+        assert indexer._get_file_hash(path) == _expected_hash(path)
+
+    def test_missing_file_hashes_empty(self, indexer, tmp_project):
+        assert indexer._get_file_hash(tmp_project / "missing.py") == ""
+
+    def test_reindex_check_digest_is_reused(self, indexer, tmp_project, monkeypatch):
+        path = tmp_project / "auth.py"
+        stat = path.stat()
+        indexer.manifest["files"]["auth.py"] = {
+            "hash": "stale",
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+        assert indexer._needs_reindex(path) is True
+
+        monkeypatch.setattr(indexer, "_get_file_hash", MagicMock(return_value="rehashed"))
+        expected = _expected_hash(path)
+        assert indexer._get_file_hash_reused(path, stat) == expected
+        indexer._get_file_hash.assert_not_called()
+
+        # Each digest is handed over once
+        assert indexer._get_file_hash_reused(path, stat) == "rehashed"
+
+    def test_unchanged_file_is_not_cached(self, indexer, tmp_project):
+        path = tmp_project / "auth.py"
+        stat = path.stat()
+        indexer.manifest["files"]["auth.py"] = {
+            "hash": indexer._get_file_hash(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+        assert indexer._needs_reindex(path) is False
+        assert indexer._hash_cache == {}
+
+    def test_other_algorithm_digests_are_migrated(self, indexer, tmp_project):
+        path = tmp_project / "auth.py"
+        stat = path.stat()
+        indexer.manifest["hash_algo"] = "md5"
+        indexer.manifest["files"]["auth.py"] = {
+            "hash": "old-digest",
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+
+        # Matching size and mtime are trusted while the digest is replaced
+        assert indexer._needs_reindex(path) is False
+        assert indexer.manifest["files"]["auth.py"]["hash"] == _expected_hash(path)
+
+
+class TestFileDiscovery:
+    """Test the project walk that picks files to index."""
+
+    def test_walk_finds_nested_files_and_skips_excluded_dirs(self, indexer, tmp_project):
+        (tmp_project / "pkg").mkdir()
+        (tmp_project / "pkg" / "util.py").write_text("def helper():\n    return 1\n")
+        (tmp_project / "node_modules").mkdir()
+        (tmp_project / "node_modules" / "dep.js").write_text("const x = 1;\n")
+
+        found = {p.relative_to(tmp_project).as_posix() for p in indexer._get_files_to_index()}
+
+        assert "pkg/util.py" in found
+        assert "auth.py" in found
+        assert not any(path.startswith("node_modules") for path in found)
+
+    def test_exclude_patterns_match_substrings_and_globs(self, indexer, tmp_project):
+        (tmp_project / ".git").mkdir()
+        (tmp_project / ".git" / "hooks.py").write_text("import os\n")
+        (tmp_project / "api.generated.md").write_text("# API\n")
+
+        indexer.exclude_patterns = [".git", "*.generated.md"]
+        assert not indexer._should_index_file(tmp_project / ".git" / "hooks.py")
+        assert not indexer._should_index_file(tmp_project / "api.generated.md")
+        assert indexer._should_index_file(tmp_project / "auth.py")
+
+        # Changing the list takes effect without rebuilding the indexer
+        indexer.exclude_patterns = ["auth"]
+        assert not indexer._should_index_file(tmp_project / "auth.py")
+
+    def test_include_lookup_matches_path_match(self, indexer, tmp_project):
+        indexer.include_patterns = ["*.py", "*.tar.gz", "Makefile", "*.bashrc", "Dockerfile*"]
+        names = ["a.py", "a.PY", "x.tar.gz", "y.gz", "Makefile", ".bashrc", "Dockerfile.dev"]
+        for name in names:
+            path = tmp_project / name
+            path.write_text("x = 1\n")
+            expected = any(path.match(p) for p in indexer.include_patterns)
+            assert indexer._should_index_file(path) == expected, name
+
+    def test_include_lookup_ignores_case_for_windows_paths(self, indexer, tmp_project):
+        indexer.include_patterns = ["*.py", "*.js", "Makefile", "*.tar.gz"]
+        stat = (tmp_project / "auth.py").stat()
+        names = ["FOO.PY", "Main.JS", "MAKEFILE", "X.TAR.GZ", "a.txt"]
+        for name in names:
+            path = PureWindowsPath("C:/project", name)
+            expected = any(path.match(p) for p in indexer.include_patterns)
+            assert expected == (name != "a.txt"), name
+            assert indexer._should_index_file(path, stat) == expected, name
+
+    def test_walk_shares_one_stat_per_file(self, tmp_project, monkeypatch):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        indexer.index_project()
+        checks = MagicMock(wraps=indexer._needs_reindex)
+        monkeypatch.setattr(indexer, "_needs_reindex", checks)
+
+        assert indexer._get_files_to_index() == []
+        assert checks.call_count == len(indexer.manifest["files"])
+        for (path, stat), _ in checks.call_args_list:
+            assert stat.st_size == os.stat(path).st_size
+
+    def test_changed_and_new_files_skip_the_hash_check(self, tmp_project, monkeypatch):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        indexer.index_project()
+        (tmp_project / "auth.py").write_text("def login():\n    return False\n")
+        (tmp_project / "new.py").write_text("x = 1\n")
+        checks = MagicMock(wraps=indexer._needs_reindex)
+        monkeypatch.setattr(indexer, "_needs_reindex", checks)
+
+        found = {p.name for p in indexer._get_files_to_index()}
+
+        assert found == {"auth.py", "new.py"}
+        assert checks.call_count == len(indexer.manifest["files"]) - 1
+
+    def test_migrated_digests_are_saved_when_nothing_changed(self, tmp_project):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        indexer.index_project()
+        for entry in indexer.manifest["files"].values():
+            entry["hash"] = "old-digest"
+        indexer.manifest["hash_algo"] = "md5"
+        indexer._save_manifest()
+
+        reopened = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        stats = reopened.index_project()
+
+        assert stats["files_indexed"] == 0
+        saved = ProjectIndexer(tmp_project, embedder=_CountingEmbedder()).manifest
+        assert saved["hash_algo"] == indexer_module.HASH_ALGO
+        assert saved["files"]["auth.py"]["hash"] == _expected_hash(tmp_project / "auth.py")
+
+
+class TestEmbeddingBatches:
+    """Test embedding chunks from several files per call."""
+
+    def test_chunks_from_many_files_share_embed_calls(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(indexer_module, "EMBED_BATCH_CHUNKS", 10_000)
+        embedder = _CountingEmbedder()
+        indexer = ProjectIndexer(tmp_project, embedder=embedder)
+
+        stats = indexer.index_project()
+
+        assert len(embedder.calls) == 1
+        assert stats["chunks_created"] == embedder.calls[0]
+        assert stats["files_failed"] == 0
+        assert len(indexer.manifest["files"]) == stats["files_total"]
+        assert indexer.table.count_rows() == stats["chunks_created"]
+
+    def test_batch_shares_one_timestamp(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(indexer_module, "EMBED_BATCH_CHUNKS", 10_000)
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+
+        indexer.index_project()
+
+        stamps = set(indexer.table.to_arrow().column("indexed_at").to_pylist())
+        assert len(stamps) == 1
+        assert {entry["indexed_at"] for entry in indexer.manifest["files"].values()} == stamps
+
+    def test_batches_flush_at_threshold(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(indexer_module, "EMBED_BATCH_CHUNKS", 1)
+        embedder = _CountingEmbedder()
+        indexer = ProjectIndexer(tmp_project, embedder=embedder)
+
+        stats = indexer.index_project()
+
+        assert len(embedder.calls) == len(indexer.manifest["files"])
+        assert sum(embedder.calls) == stats["chunks_created"]
+
+    def test_embedding_runs_on_its_own_pool(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(indexer_module, "EMBED_BATCH_CHUNKS", 1)
+        embedder = _CountingEmbedder()
+        indexer = ProjectIndexer(tmp_project, embedder=embedder, max_workers=2)
+
+        stats = indexer.index_project()
+
+        assert embedder.threads and all(name.startswith("embed") for name in embedder.threads)
+        assert indexer.table.count_rows() == stats["chunks_created"]
+
+    def test_records_are_written_as_fixed_size_vectors(self, tmp_project):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        indexer.index_project()
+
+        stored = indexer.table.to_arrow()
+        assert (
+            stored.schema.field("embedding").type.list_size == _CountingEmbedder.embedding_dim
+        )
+        assert stored.schema.field("start_line").type == "int32"
+        assert (
+            stored.column("embedding").combine_chunks().flatten().to_numpy().dtype
+            == np.float32
+        )
+
+
+class TestRecordColumns:
+    """Test column-wise accumulation of chunk records."""
+
+    def test_build_records_fills_columns(self, tmp_project):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        path = tmp_project / "auth.py"
+        chunks = indexer._read_and_chunk(path)
+        embeddings = np.zeros((len(chunks), _CountingEmbedder.embedding_dim))
+
+        records = indexer._build_records(path, chunks, embeddings)
+
+        assert len(records) == len(chunks)
+        assert set(records.columns["file_path"]) == {"auth.py"}
+        assert records.columns["chunk_id"][0] == "auth_0"
+        assert records.embedding_matrix().dtype == np.float32
+
+    def test_wrong_embedding_count_is_rejected(self, tmp_project):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        path = tmp_project / "auth.py"
+        chunks = indexer._read_and_chunk(path)
+
+        with pytest.raises(ValueError):
+            indexer._build_records(path, chunks, np.zeros((len(chunks) + 1, 8)))
+
+    def test_extend_concatenates_rows_and_embeddings(self):
+        first, second = RecordColumns(), RecordColumns()
+        for records, rows in ((first, 2), (second, 3)):
+            for name in RecordColumns.NAMES:
+                records.columns[name].extend([""] * rows)
+            records.embeddings.append(np.ones((rows, 4), dtype=np.float32))
+
+        first.extend(second)
+
+        assert len(first) == 5
+        assert first.embedding_matrix().shape == (5, 4)
+
+    def test_relative_path_is_resolved_once_per_file(self, tmp_project, monkeypatch):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        path = tmp_project / "auth.py"
+        chunks = indexer._read_and_chunk(path)
+        relative = MagicMock(wraps=indexer_module.normalize_relative_path)
+        monkeypatch.setattr(indexer_module, "normalize_relative_path", relative)
+
+        records = indexer._build_records(path, chunks, np.zeros((len(chunks), 8)))
+
+        relative.assert_called_once()
+        assert records.files["auth.py"]["chunks"] == len(chunks)
+
+    def test_walk_supplies_relative_paths(self, tmp_project, monkeypatch):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        (tmp_project / "pkg").mkdir()
+        path = tmp_project / "pkg" / "util.py"
+        path.write_text("def helper():\n    return 1\n")
+        assert path in indexer._get_files_to_index()
+        relative = MagicMock(wraps=indexer_module.normalize_relative_path)
+        monkeypatch.setattr(indexer_module, "normalize_relative_path", relative)
+
+        chunks = indexer._read_and_chunk(path)
+        records = indexer._build_records(path, chunks, np.zeros((len(chunks), 8)))
+
+        relative.assert_not_called()
+        assert set(records.columns["file_path"]) == {"pkg/util.py"}
+
+
+class TestIncrementalWrites:
+    """Test writing records to the table while indexing runs."""
+
+    def test_records_are_flushed_in_batches(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(indexer_module, "EMBED_BATCH_CHUNKS", 1)
+        monkeypatch.setattr(indexer_module, "FLUSH_RECORDS", 1)
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        indexer._init_database()
+        writes = MagicMock(wraps=indexer.table.add)
+        monkeypatch.setattr(indexer.table, "add", writes)
+        monkeypatch.setattr(indexer, "_init_database", lambda: None)
+
+        stats = indexer.index_project()
+
+        assert writes.call_count > 1
+        written = sum(call.args[0].num_rows for call in writes.call_args_list)
+        assert written == stats["chunks_created"]
+        assert indexer.table.count_rows() == stats["chunks_created"]
+
+    def test_manifest_totals_track_written_files(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(indexer_module, "FLUSH_RECORDS", 1)
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+
+        stats = indexer.index_project()
+
+        assert indexer.manifest["chunk_count"] == stats["chunks_created"]
+        assert indexer.manifest["file_count"] == len(indexer.manifest["files"])
+
+        indexer._forget_file("auth.py")
+        assert indexer.manifest["chunk_count"] == sum(
+            entry["chunks"] for entry in indexer.manifest["files"].values()
+        )
+
+
+class TestExtensionlessFiles:
+    """Test content sniffing for files without an extension."""
+
+    def test_code_and_config_are_detected(self, indexer, tmp_project):
+        (tmp_project / "script").write_text("#!/bin/sh\necho hi\n")
+        (tmp_project / "Tool").write_text("IMPORT Something\n")
+        (tmp_project / "notes").write_text("just some words\n")
+        (tmp_project / "blob").write_bytes(b"\xff\xfe\x00binary")
+
+        assert indexer._should_index_extensionless_file(tmp_project / "script")
+        assert indexer._should_index_extensionless_file(tmp_project / "Tool")
+        assert not indexer._should_index_extensionless_file(tmp_project / "notes")
+        assert not indexer._should_index_extensionless_file(tmp_project / "blob")
+
+    def test_changed_file_is_sniffed_again(self, indexer, tmp_project):
+        path = tmp_project / "Makefile2"
+        path.write_text("plain text\n")
+        assert not indexer._should_index_extensionless_file(path)
+
+        path.write_text("version = 2 and more text\n")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+        assert indexer._should_index_extensionless_file(path)
+
+
+class TestReadText:
+    """Test reading file content for chunking."""
+
+    def test_utf8_is_read_whole(self, indexer, tmp_project):
+        path = tmp_project / "unicode.py"
+        path.write_text("name = 'café'\n" * 1000, encoding="utf-8")
+        assert indexer._read_text(path) == path.read_text(encoding="utf-8")
+
+    def test_other_encodings_fall_back(self, indexer, tmp_project):
+        path = tmp_project / "legacy.py"
+        path.write_bytes("name = 'café'\n".encode("latin-1"))
+        assert indexer._read_text(path) == "name = 'café'\n"
+
+
+class TestManifestFile:
+    """Test manifest persistence."""
+
+    def test_manifest_round_trips_compact(self, indexer):
+        indexer._record_files(
+            {"café.py": {"hash": "abc", "size": 1, "mtime": 2.5, "chunks": 3}}
+        )
+        indexer._save_manifest()
+
+        raw = indexer.manifest_path.read_bytes()
+        assert b"\n" not in raw
+        assert not indexer.manifest_path.with_suffix(".json.tmp").exists()
+
+        reloaded = indexer._load_manifest()
+        assert reloaded["files"]["café.py"]["chunks"] == 3
+        assert reloaded["chunk_count"] == 3
+
+
+class TestCleanup:
+    """Test removing deleted files from the index."""
+
+    def test_removed_files_are_deleted_in_one_call(self, tmp_project, monkeypatch):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        indexer.index_project()
+        removed = sorted(indexer.manifest["files"])[:2]
+        for file_str in removed:
+            (tmp_project / file_str).unlink()
+        deletes = MagicMock(wraps=indexer.table.delete)
+        monkeypatch.setattr(indexer.table, "delete", deletes)
+
+        indexer._cleanup_removed_files()
+
+        deletes.assert_called_once()
+        stored = set(indexer.table.to_arrow().column("file_path").to_pylist())
+        assert not stored & set(removed)
+        assert not set(indexer.manifest["files"]) & set(removed)
+
+
+class TestWorkerPools:
+    """Test sizing of the reader and embedding pools."""
+
+    def test_embed_workers_default_above_readers(self, indexer):
+        assert indexer.embed_workers == indexer_module.EMBED_WORKERS
+        assert indexer.embed_workers > indexer.max_workers
+
+
+class TestVectorIndex:
+    """Test building the ANN index after bulk loads."""
+
+    def test_vector_index_built_after_large_loads(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(indexer_module, "VECTOR_INDEX_MIN_ROWS", 1)
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        indexer._init_database()
+        create_index = MagicMock()
+        monkeypatch.setattr(indexer.table, "create_index", create_index)
+        monkeypatch.setattr(indexer, "_init_database", lambda: None)
+
+        stats = indexer.index_project()
+
+        create_index.assert_called_once()
+        kwargs = create_index.call_args.kwargs
+        assert kwargs["vector_column_name"] == "embedding"
+        assert kwargs["metric"] == "l2"
+        assert _CountingEmbedder.embedding_dim % kwargs["num_sub_vectors"] == 0
+        assert kwargs["num_partitions"] <= stats["chunks_created"]
+
+    def test_exact_top_hits_survive_indexing(self, tmp_project, monkeypatch):
+        from mini_rag.search import CodeSearcher
+
+        dim, rows = 32, 3000
+        indexer = ProjectIndexer(
+            tmp_project, embedder=MagicMock(get_embedding_dim=lambda: dim)
+        )
+        indexer._init_database()
+        rng = np.random.default_rng(0)
+        vectors = rng.random((rows, dim), dtype=np.float32)
+        records = RecordColumns()
+        for name in RecordColumns.NAMES:
+            records.columns[name] = [
+                0 if name in _INT_COLUMNS else f"c{i}" for i in range(rows)
+            ]
+        records.embeddings.append(vectors)
+        indexer.table.add(indexer._records_to_arrow(records))
+        monkeypatch.setattr(indexer_module, "VECTOR_INDEX_MIN_ROWS", 1000)
+        indexer._build_vector_index()
+        assert indexer.table.list_indices()
+
+        searcher = CodeSearcher(tmp_project, embedder=MagicMock(), db=indexer.db)
+        for query in vectors[:20] + rng.normal(0, 0.01, (20, dim)).astype(np.float32):
+            exact = int(np.argmin(((vectors - query) ** 2).sum(axis=1)))
+            found = searcher._vector_search(query, 5)
+            assert found["content"].iloc[0] == f"c{exact}"
+            assert found["_distance"].iloc[0] == pytest.approx(
+                float(((vectors[exact] - query) ** 2).sum()), rel=1e-4
+            )
+
+    def test_small_tables_are_not_indexed(self, tmp_project, monkeypatch):
+        indexer = ProjectIndexer(tmp_project, embedder=_CountingEmbedder())
+        indexer._init_database()
+        create_index = MagicMock()
+        monkeypatch.setattr(indexer.table, "create_index", create_index)
+        monkeypatch.setattr(indexer, "_init_database", lambda: None)
+
+        indexer.index_project()
+
+        create_index.assert_not_called()
@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from mini_rag.llm_synthesizer import LLMSynthesizer, SynthesisResult
+from mini_rag.llm_synthesizer import OLLAMA_KEEP_ALIVE, LLMSynthesizer, SynthesisResult
 
 
 class TestSynthesizerInit:
@@ -190,3 +190,43 @@ class TestSynthesizeSearchResults:
         result = synth.synthesize_search_results("query", [r], Path("/tmp"))
         assert "failed" in result.summary.lower()
         assert result.confidence == 0.0
+
+
+class TestHTTPSession:
+    """Test use of a caller-supplied HTTP session."""
+
+    def test_uses_supplied_session(self):
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {"models": [{"name": "qwen3:1.7b"}]}
+
+        synth = LLMSynthesizer(provider="ollama", session=session)
+        assert synth._get_available_models() == ["qwen3:1.7b"]
+        session.get.assert_called_once_with("http://localhost:11434/api/tags", timeout=5)
+
+    def test_streamed_lines_parsed_from_bytes(self):
+        session = MagicMock()
+        session.post.return_value.status_code = 200
+        session.post.return_value.iter_lines.return_value = [
+            b'{"response": "Hello", "done": false}',
+            b"not json",
+            b'{"response": " world", "done": true}',
+        ]
+
+        synth = LLMSynthesizer(provider="ollama", session=session)
+        result = synth._handle_streaming_with_early_stop({}, "qwen3:1.7b", False, 0.0)
+        assert result == "Hello world"
+
+    def test_generate_keeps_model_loaded(self):
+        session = MagicMock()
+        session.post.return_value.status_code = 200
+        session.post.return_value.json.return_value = {"response": "ok"}
+
+        synth = LLMSynthesizer(provider="ollama", model="qwen3:1.7b", session=session)
+        synth._initialized = True
+        synth.available_models = ["qwen3:1.7b"]
+        synth.safeguard_detector = None
+
+        assert synth._call_ollama("prompt", use_streaming=False) == "ok"
+        payload = session.post.call_args.kwargs["json"]
+        assert payload["keep_alive"] == OLLAMA_KEEP_ALIVE